@@ -2,10 +2,20 @@
 MAX_LOAN_AMOUNT = 2000000
 MIN_CREDIT_SCORE = 300
 MAX_CREDIT_SCORE = 850
+MAX_CONVERSATION_HISTORY = 200  # entries kept in memory per orchestrator
 AVAILABLE_CITIES = [
     'Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata',
     'Hyderabad', 'Pune', 'Ahmedabad', 'Surat', 'Jaipur'
 ]
 import os
 DATASET_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'modules', 'loan_processing', 'data', 'sample_loans.csv'))
-PROMPT_TEMPLATE_PATH = 'agentic_ai/modules/loan_processing/prompts/loan_prompt_template.txt'
\ No newline at end of file
+PROMPT_TEMPLATE_PATH = 'agentic_ai/modules/loan_processing/prompts/loan_prompt_template.txt'
+# Reject short requests without any amount before starting a session or calling the LLM
+STRICT_INPUT_VALIDATION = os.getenv("STRICT_INPUT_VALIDATION", "false").lower() in ("true", "1", "yes", "y")
+MIN_REQUEST_WORDS = 8  # requests at least this long are always let through
+# Sentence embedding model shared by purpose matching and the compliance cache.
+# EMBEDDING_BACKEND=onnx loads the int8-quantized ONNX export instead of the FP32
+# PyTorch weights (needs `pip install optimum[onnxruntime]`)
+EMBEDDING_MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
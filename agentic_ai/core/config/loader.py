@@ -1,9 +1,120 @@
+from agentic_ai.core.config.reliability import STRUCTURAL_CACHE_ENABLED, STRUCTURAL_CACHE_SIZE
 from agentic_ai.core.llm.factory import LLMFactory
+from agentic_ai.core.llm.response_cache import ResponseCache
 from langchain.llms.base import LLM
 from langchain.callbacks.manager import CallbackManagerForLLMRun
-from typing import Any, Dict, List, Optional, Union
-import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import re
+from contextvars import ContextVar
+from functools import lru_cache
+try:
+    import orjson
+except ImportError:  # stdlib json also accepts bytes
+    import json as orjson
+
+# ReAct prompts get their responses normalized; one scan finds either marker
+_REACT_PROMPT_RE = re.compile(r"Thought:|Action:")
+# A Thought / Action / Action Input line (leading and trailing whitespace excluded from the match)
+_REACT_LINE_RE = re.compile(r"^[ \t]*(?P<line>(?P<kind>Thought|Action|Action Input):.*?)[ \t\r]*$", re.MULTILINE)
+# An Action or Final Answer line, possibly indented
+_ACTION_OR_FINAL_LINE_RE = re.compile(r"^\s*(?:Action|Final Answer):", re.MULTILINE)
+
+# Per-request values masked out of prompts so structurally identical ReAct turns share a cache entry:
+# PAN, Aadhaar, session ids and ISO timestamps
+_VOLATILE_FIELD_RE = re.compile(
+    r"\b[A-Z]{5}\d{4}[A-Z]\b"
+    r"|\b\d{4}[ -]?\d{4}[ -]?\d{4}\b"
+    r"|\bloan_\d{8}_\d{6}_[0-9a-f]{8}\b"
+    r"|\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?"
+)
+_PLACEHOLDER_RE = re.compile(r"\x00(\d+)\x00")
+_structural_cache = ResponseCache(maxsize=STRUCTURAL_CACHE_SIZE)
+# Session the current workflow runs for; structural entries are never shared across sessions
+_structural_cache_scope: ContextVar[Optional[str]] = ContextVar("structural_cache_scope", default=None)
+
+def set_structural_cache_scope(session_id: Optional[str]) -> None:
+    """Scopes structural ReAct cache entries to one session; None disables the cache for this context."""
+    _structural_cache_scope.set(session_id)
+
+def _structural_key(scope: str, llm_type: str, prompt: str, stop: Optional[List[str]], kwargs: dict) -> Tuple[bytes, List[str]]:
+    """Hashes the prompt template (volatile values masked) and returns it with the masked values in order."""
+    prompt = prompt.rstrip()
+    variables = _VOLATILE_FIELD_RE.findall(prompt)
+    template = _VOLATILE_FIELD_RE.sub("\x00", prompt)
+    return ResponseCache.make_key(scope, llm_type, template, stop, sorted(kwargs.items())), variables
+
+def _to_response_template(response: str, variables: List[str]) -> Optional[str]:
+    """Replaces this request's values in the response with placeholders; None if other volatile values remain."""
+    for index in sorted(range(len(variables)), key=lambda i: -len(variables[i])):
+        response = response.replace(variables[index], f"\x00{index}\x00")
+    # Never cache a response carrying a value the next request could not substitute
+    return None if _VOLATILE_FIELD_RE.search(response) else response
+
+def _from_response_template(template: str, variables: List[str]) -> str:
+    return _PLACEHOLDER_RE.sub(lambda m: variables[int(m.group(1))], template)
+
+# Appended when a Thought has no Action or Final Answer
+_DEFAULT_ACTION_SUFFIX = "\nAction: UserInteraction\nAction Input: Please provide more information for your loan application."
+
+# Common fields that might contain the actual thought in a JSON-wrapped response
+_JSON_TEXT_FIELDS = ("thought", "thinking", "reasoning", "response", "answer", "text", "content")
+
+def _unwrap_json_response(response: str) -> str:
+    """Returns the text field of a JSON-wrapped response, or the response unchanged."""
+    if not (response.startswith("{") and response.endswith("}")):
+        return response
+    try:
+        json_data = orjson.loads(response.encode())
+        for field in _JSON_TEXT_FIELDS:
+            if field in json_data:
+                print(f"Extracted response from JSON field: {field}")
+                return json_data[field]
+    except:
+        # If JSON parsing fails, continue with original response
+        pass
+    return response
+
+@lru_cache(maxsize=256)
+def _enforce_react_format_cached(response: str) -> str:
+    """Normalize one raw LLM response to the ReAct format; pure, so repeated responses are cache hits."""
+    response = response.strip()
+    
+    # Fast path: an already well-formed ReAct step comes back unchanged
+    if (response.startswith("Thought:") and _ACTION_OR_FINAL_LINE_RE.search(response)
+            and "Observation:" not in response):
+        return response
+    
+    # In case we got JSON or other non-standard output, try to extract text
+    response = _unwrap_json_response(response)
+    
+    # CRITICAL: Reject responses with fake "Observation:" lines
+    if "Observation:" in response:
+        print("[DEBUG] Detected hallucinated Observation - replacing with simple action")
+        # Extract just the thought and first action if any, up to the first Action Input
+        found = {}
+        for match in _REACT_LINE_RE.finditer(response):
+            found.setdefault(match.group("kind"), match.group("line"))
+            if match.group("kind") == "Action Input":
+                break
+        
+        if len(found) == 3:
+            response = f"{found['Thought']}\n{found['Action']}\n{found['Action Input']}"
+        else:
+            response = "Thought: I need to ask for user input.\nAction: UserInteraction\nAction Input: Please provide more information."
+
+    # Make sure response starts with "Thought:"
+    if not response.startswith("Thought:"):
+        response = f"Thought: {response}"
+        
+    # Check for missing Action: or Final Answer: after Thought: (the Thought is guaranteed above)
+    has_action_or_final = _ACTION_OR_FINAL_LINE_RE.search(response) is not None
+            
+    # If we have a Thought but no Action or Final Answer, append a default one
+    if not has_action_or_final:
+        # Default to UserInteraction as safest option
+        response = f"{response}{_DEFAULT_ACTION_SUFFIX}"
+                
+    return response
 
 class LangChainLLMWrapper(LLM):
     """Enhanced LangChain wrapper for custom LLM implementations with unified response formatting."""
@@ -12,6 +123,8 @@ class LangChainLLMWrapper(LLM):
         super().__init__(**kwargs)
         # Use object.__setattr__ to bypass Pydantic validation
         object.__setattr__(self, '_llm', LLMFactory.get_llm())
+        # Bound once so each call skips the attribute lookups on the hot ReAct loop
+        object.__setattr__(self, '_call_inner', self._llm._call)
     
     @property
     def _llm_type(self) -> str:
@@ -22,82 +135,61 @@ class LangChainLLMWrapper(LLM):
         
         This ensures both Groq and OpenAI produce consistent outputs.
         """
-        response = response.strip()
-        
-        # In case we got JSON or other non-standard output, try to extract text
-        if response.startswith("{") and "}" in response:
-            try:
-                # Try to parse as JSON and extract relevant fields
-                json_data = json.loads(response)
-                # Look for common fields that might contain the actual thought
-                for field in ["thought", "thinking", "reasoning", "response", "answer", "text", "content"]:
-                    if field in json_data:
-                        response = json_data[field]
-                        print(f"Extracted response from JSON field: {field}")
-                        break
-            except:
-                # If JSON parsing fails, continue with original response
-                pass
-        
-        # CRITICAL: Reject responses with fake "Observation:" lines
-        if "Observation:" in response:
-            print("[DEBUG] Detected hallucinated Observation - replacing with simple action")
-            # Extract just the thought and first action if any
-            lines = response.split('\n')
-            thought_line = None
-            action_line = None
-            action_input_line = None
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("Thought:") and thought_line is None:
-                    thought_line = line
-                elif line.startswith("Action:") and action_line is None:
-                    action_line = line
-                elif line.startswith("Action Input:") and action_input_line is None:
-                    action_input_line = line
-                    break
-            
-            if thought_line and action_line and action_input_line:
-                response = f"{thought_line}\n{action_line}\n{action_input_line}"
-            else:
-                response = "Thought: I need to ask for user input.\nAction: UserInteraction\nAction Input: Please provide more information."
-
-        # Make sure response starts with "Thought:"
-        if not response.startswith("Thought:"):
-            response = f"Thought: {response}"
-            
-        # Check for missing Action: or Final Answer: after Thought:
-        lines = response.split("\n")
-        has_thought = False
-        has_action_or_final = False
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Thought:"):
-                has_thought = True
-            if line.startswith("Action:") or line.startswith("Final Answer:"):
-                has_action_or_final = True
-                
-        # If we have a Thought but no Action or Final Answer, append a default one
-        if has_thought and not has_action_or_final:
-            # Default to UserInteraction as safest option
-            response += "\nAction: UserInteraction"
-            response += "\nAction Input: Please provide more information for your loan application."
-                    
-        return response
+        return _enforce_react_format_cached(response)
 
     def _call(self, prompt: str, stop: Optional[List[str]] = None,
               run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> str:
         """Call the underlying LLM with uniform format enforcement."""
+        is_react_prompt = _REACT_PROMPT_RE.search(prompt) is not None
+
+        # ReAct turns within a session repeat the same prompt template with new values swapped in
+        cache_key = None
+        scope = _structural_cache_scope.get() if STRUCTURAL_CACHE_ENABLED else None
+        if is_react_prompt and scope is not None:
+            cache_key, variables = _structural_key(scope, self._llm._llm_type, prompt, stop, kwargs)
+            cached = _structural_cache.get(cache_key)
+            if cached is not None:
+                return _from_response_template(cached, variables)
+
         # Get the raw response from the LLM
-        raw_response = self._llm._call(prompt, stop, **kwargs)
+        raw_response = self._call_inner(prompt, stop, **kwargs)
         
         # Apply consistent format enforcement for ALL LLM types
         # This ensures both Groq and OpenAI work identically
-        if "Thought:" in prompt or "Action:" in prompt:
-            formatted_response = self._enforce_react_format(raw_response)
-        else:
-            formatted_response = raw_response
+        if not is_react_prompt:
+            return raw_response
+        formatted_response = self._enforce_react_format(raw_response)
+
+        # Only a genuine ReAct step is cached; error and fallback strings never are
+        if cache_key is not None and ("Action:" in raw_response or "Final Answer:" in raw_response):
+            template = _to_response_template(formatted_response, variables)
+            if template is not None:
+                _structural_cache.put(cache_key, template)
             
-        return formatted_response
\ No newline at end of file
+        return formatted_response
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None,
+                     run_manager: Optional[Any] = None, **kwargs) -> str:
+        """Async call through the underlying LLM's batcher, with the same format enforcement as _call."""
+        raw_response = await self._llm._acall(prompt, stop, **kwargs)
+        if _REACT_PROMPT_RE.search(prompt) is not None:
+            return self._enforce_react_format(raw_response)
+        return raw_response
+
+    def stream_response(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> Iterator[str]:
+        """Yield the underlying LLM's raw response chunks as they are generated."""
+        return self._llm._stream(prompt, stop, **kwargs)
+
+    def call_with_tools(self, prompt: str, tools: List[Dict[str, Any]], **kwargs) -> Optional[Dict[str, Any]]:
+        """Request typed tool calls from the underlying LLM; None if it cannot provide them."""
+        return self._llm._call_with_tools(prompt, tools, **kwargs)
+
+
+_shared_wrapper: Optional[LangChainLLMWrapper] = None
+
+def get_shared_llm_wrapper() -> LangChainLLMWrapper:
+    """Returns the process-wide LangChainLLMWrapper shared by all agents and the workflow."""
+    global _shared_wrapper
+    if _shared_wrapper is None:
+        _shared_wrapper = LangChainLLMWrapper()
+    return _shared_wrapper
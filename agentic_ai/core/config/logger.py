@@ -1,17 +1,31 @@
 import logging
 from langchain.callbacks.base import BaseCallbackHandler
+from agentic_ai.core.config.reliability import VERBOSE_LOGGING
+
+# Configure the root handler once, at import, unless the application already did
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 def get_logger(name: str, level=logging.INFO):
     """
-    Initializes and returns a logger.
+    Returns the named logger at the given level.
     """
-    logging.basicConfig(level=level,
-                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    return logging.getLogger(name)
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    return logger
 
 class DebugCallbackHandler(BaseCallbackHandler):
     """Custom callback for debugging AgentExecutor steps."""
+
+    @property
+    def ignore_agent(self) -> bool:
+        # Lets LangChain skip the agent callbacks entirely when step logging is off
+        return not VERBOSE_LOGGING
+
     def on_agent_action(self, action, **kwargs):
+        if not VERBOSE_LOGGING:
+            return
         try:
             # Extract and display the thought preceding the action
             # This is the key part to restore the reasoning
@@ -47,6 +61,8 @@ class DebugCallbackHandler(BaseCallbackHandler):
                 print(f"[DEBUG] Action log: {action.log}")
 
     def on_agent_observation(self, observation, **kwargs):
+        if not VERBOSE_LOGGING:
+            return
         try:
             # Truncate overly long observations to keep logs readable
             obs_str = str(observation)
@@ -57,6 +73,8 @@ class DebugCallbackHandler(BaseCallbackHandler):
             print(f"[DEBUG] Error in observation callback: {str(e)}")
 
     def on_agent_finish(self, finish, **kwargs):
+        if not VERBOSE_LOGGING:
+            return
         try:
             # Extract and display the final thought
             if hasattr(finish, 'log'):
@@ -101,34 +119,6 @@ class DebugCallbackHandler(BaseCallbackHandler):
         # Handle chain start events safely without accessing any attributes
         pass
         
-    def on_chain_end(self, outputs, **kwargs):
-        # Handle chain end events safely
-        pass
-        
-    def on_llm_start(self, serialized, prompts, **kwargs):
-        # Handle LLM start events safely
-        pass
-        
-    def on_llm_end(self, response, **kwargs):
-        # Handle LLM end events safely
-        pass
-        
-    def on_llm_error(self, error, **kwargs):
-        # Handle LLM error events safely
-        pass
-        
-    def on_tool_start(self, serialized, input_str, **kwargs):
-        # Handle tool start events safely
-        pass
-        
-    def on_tool_end(self, output, **kwargs):
-        # Handle tool end events safely
-        pass
-        
-    def on_tool_error(self, error, **kwargs):
-        # Handle tool error events safely
-        pass
-    
     def on_chain_end(self, outputs, **kwargs):
         # Handle chain end events safely
         pass
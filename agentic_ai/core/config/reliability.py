@@ -1,17 +1,30 @@
 # Reliability Configuration for Agentic AI System
+import os
 
 # Retry Configuration
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
 EXPONENTIAL_BACKOFF = True
+RETRY_JITTER = 0.1  # max random seconds added to each backoff delay
+
+# Circuit Breaker: stop calling the LLM after repeated failures inside a short window
+CIRCUIT_BREAKER_THRESHOLD = 5  # consecutive failed calls before the circuit opens
+CIRCUIT_BREAKER_WINDOW = 60  # seconds the circuit stays open
 
 # Timeout Configuration
 API_TIMEOUT = 10  # seconds
 LLM_TIMEOUT = 30  # seconds
+HTTP_CONNECT_TIMEOUT = 5.0  # seconds to establish a connection to the LLM API
+HTTP_MAX_CONNECTIONS = 32
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
 
 # Agent Configuration
 MAX_AGENT_ITERATIONS = 30
 AGENT_EARLY_STOPPING = "generate"
+# Tools allowed to run at once; 1 keeps strictly serial tool dispatch
+TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "1"))
+# Ask providers that support it for typed tool calls instead of parsing ReAct text
+NATIVE_TOOL_CALLING = os.getenv("NATIVE_TOOL_CALLING", "false").lower() in ("true", "1", "yes", "y")
 
 # Error Handling
 FALLBACK_ENABLED = True
@@ -31,7 +44,29 @@ LOG_FALLBACKS = True
 
 # Rate Limiting
 MIN_REQUEST_INTERVAL = 1.0  # seconds between requests
+OLLAMA_MIN_REQUEST_INTERVAL = 0.5  # local LLMs can handle more requests
+# OpenAI account quotas: requests and (estimated) tokens per minute
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+OPENAI_RATE_LIMIT_BURST = 10  # requests allowed back-to-back before the RPM pacing applies
 RATE_LIMIT_BACKOFF = 2.0  # seconds to wait on rate limit
+RATE_LIMIT_BURST = 3  # requests allowed back-to-back before MIN_REQUEST_INTERVAL applies
+ASYNC_BATCH_LATENCY_MS = 5.0  # async calls arriving this close together are dispatched as one batch
+ASYNC_MAX_BATCH = 16
+
+# Response Caching
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("true", "1", "yes", "y")
+LLM_CACHE_SIZE = 1024  # identical prompts remembered per process
+LLM_CACHE_MAX_TEMPERATURE = 0.2  # hotter sampling is not cached, since repeats are expected to differ
+# Opt-in: replay a session's earlier ReAct step when the same prompt template recurs with new values
+STRUCTURAL_CACHE_ENABLED = os.getenv("STRUCTURAL_CACHE_ENABLED", "false").lower() in ("true", "1", "yes", "y")
+STRUCTURAL_CACHE_SIZE = 512  # ReAct prompt templates (per-request values masked) remembered per process
+SEMANTIC_CACHE_THRESHOLD = 0.95  # cosine similarity at which a reworded query reuses a cached answer
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_TTL = 600  # seconds a semantically matched LLM completion stays reusable
+# Opt-in: answer near-duplicate OpenAI ReAct prompts from cache (costs one embedding call per miss)
+OPENAI_SEMANTIC_CACHE_ENABLED = os.getenv("OPENAI_SEMANTIC_CACHE_ENABLED", "false").lower() in ("true", "1", "yes", "y")
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
 
 # Workflow Configuration
 WORKFLOW_TIMEOUT = 300  # 5 minutes maximum for entire workflow
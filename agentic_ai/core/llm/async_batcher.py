@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from .response_cache import ResponseCache
+
+class AsyncBatcher:
+    """Collects async LLM calls arriving within a short window and dispatches them as one batch.
+
+    Chat APIs take a single conversation per request, so identical prompts in a batch share
+    one round trip and distinct prompts run concurrently on worker threads.
+    """
+
+    __slots__ = ('llm', 'batch_latency', 'max_batch', '_loop', '_queue', '_worker', '_inflight')
+
+    def __init__(self, llm: Any, batch_latency_ms: float = 5.0, max_batch: int = 16):
+        self.llm = llm
+        self.batch_latency = batch_latency_ms / 1000.0
+        self.max_batch = max_batch
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight = set()  # strong references keep dispatch tasks alive until done
+
+    async def submit(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
+        """Queue one call and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # The queue and worker belong to one event loop; a new loop (e.g. a later asyncio.run) gets its own
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect())
+        future = loop.create_future()
+        await self._queue.put((prompt, stop, kwargs, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch in the background so the next batch can fill while this one is in flight
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list):
+        groups: Dict[bytes, list] = {}
+        for prompt, stop, kwargs, future in batch:
+            key = ResponseCache.make_key(prompt, stop, sorted(kwargs.items()))
+            groups.setdefault(key, [prompt, stop, kwargs, []])[3].append(future)
+
+        calls = list(groups.values())
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.llm._call, prompt, stop, **kwargs) for prompt, stop, kwargs, _ in calls),
+            return_exceptions=True,
+        )
+        for (_, _, _, futures), result in zip(calls, results):
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
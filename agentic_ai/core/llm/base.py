@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+def earliest_stop_index(text: str, stop: Optional[List[str]]) -> int:
+    """Index of the earliest stop sequence in text, or -1 if none occurs."""
+    if not stop:
+        return -1
+    return min((i for i in map(text.find, stop) if i != -1), default=-1)
 
 class BaseLLM(ABC):
     """Abstract base class for all LLM implementations."""
@@ -9,8 +15,25 @@ class BaseLLM(ABC):
         """Execute the LLM call with the given prompt."""
         pass
 
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> Iterator[str]:
+        """Yield the response in chunks; providers without streaming yield it whole."""
+        yield self._call(prompt, stop, **kwargs)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
+        """Async counterpart of _call; concurrent calls are collated by a per-instance AsyncBatcher."""
+        batcher = self.__dict__.get("_async_batcher")
+        if batcher is None:
+            from agentic_ai.core.config.reliability import ASYNC_BATCH_LATENCY_MS, ASYNC_MAX_BATCH
+            from .async_batcher import AsyncBatcher
+            batcher = self._async_batcher = AsyncBatcher(self, ASYNC_BATCH_LATENCY_MS, ASYNC_MAX_BATCH)
+        return await batcher.submit(prompt, stop, **kwargs)
+
+    def _call_with_tools(self, prompt: str, tools: List[Dict[str, Any]], **kwargs) -> Optional[Dict[str, Any]]:
+        """Request native tool calls; returns None when the provider does not support them."""
+        return None
+
     @property
     @abstractmethod
     def _llm_type(self) -> str:
         """Return the type of LLM (e.g., 'groq', 'openai')."""
-        pass
\ No newline at end of file
+        pass
@@ -1,7 +1,20 @@
+import logging
+import random
 import time
-from typing import Any, List, Optional
-from groq import Groq
-from .base import BaseLLM
+from typing import Any, Dict, Iterator, List, Optional
+import httpx
+from groq import Groq, APIConnectionError, APIError, APITimeoutError, InternalServerError, RateLimitError
+from agentic_ai.core.config.reliability import (
+    MIN_REQUEST_INTERVAL, RATE_LIMIT_BURST, LLM_CACHE_ENABLED, LLM_CACHE_SIZE, LLM_CACHE_MAX_TEMPERATURE,
+    MAX_RETRIES, RETRY_DELAY, EXPONENTIAL_BACKOFF, RETRY_JITTER,
+    CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_WINDOW,
+    LLM_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+from .base import BaseLLM, earliest_stop_index
+from .rate_limiter import TokenBucket
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
 
 class GroqLLM(BaseLLM):
     """Groq LLM implementation."""
@@ -10,11 +23,22 @@ class GroqLLM(BaseLLM):
     temperature: float = 0.1
     max_tokens: int = 1024
     groq_client: Any = None
+    # Shared by all instances so concurrent agents draw from one request budget
+    _rate_limiter = TokenBucket(rate=1.0 / MIN_REQUEST_INTERVAL, capacity=RATE_LIMIT_BURST)
+    _response_cache = ResponseCache(maxsize=LLM_CACHE_SIZE)
+    _http_client: Optional[httpx.Client] = None
+    # Circuit breaker state, shared like the rate limiter
+    _consecutive_failures = 0
+    _circuit_open_until = 0.0
+    # Prompt-prefix cache accounting
+    _prompt_tokens_total = 0
+    _prompt_tokens_cached = 0
 
     def __init__(self, api_key: str):
         if api_key:
             try:
-                self.groq_client = Groq(api_key=api_key)
+                # Retries are handled in _call so backoff and the circuit breaker see every failure
+                self.groq_client = Groq(api_key=api_key, http_client=self._get_http_client(), max_retries=0)
             except Exception as e:
                 print(f"⚠️ Failed to initialize Groq client: {e}")
                 self.groq_client = None
@@ -23,48 +47,211 @@ class GroqLLM(BaseLLM):
             self.groq_client = None
 
         self._call_count = 0
-        self._last_call_time = 0.0
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.Client:
+        """Returns the pooled HTTP client shared by every Groq client in the process."""
+        if cls._http_client is None:
+            limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                  max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS)
+            timeout = httpx.Timeout(LLM_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+            try:
+                # HTTP/2 multiplexes concurrent agent calls over one connection
+                cls._http_client = httpx.Client(http2=True, limits=limits, timeout=timeout)
+            except ImportError:
+                print("⚠️ h2 package not installed, using HTTP/1.1 for Groq")
+                cls._http_client = httpx.Client(limits=limits, timeout=timeout)
+        return cls._http_client
 
     @property
     def _llm_type(self) -> str:
         return "groq"
 
+    def _wait_for_rate_limit(self):
+        """Wait for a request token; only blocks once the burst budget is spent."""
+        self._rate_limiter.acquire()
+        self._call_count += 1
+
+    def _update_rate_limit(self, headers):
+        """Drain the bucket when Groq reports no remaining request quota."""
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+            self._rate_limiter.drain()
+
+    def _circuit_is_open(self) -> bool:
+        """True while the breaker is tripped; calls skip the API and fall back immediately."""
+        return time.monotonic() < GroqLLM._circuit_open_until
+
+    def _record_success(self):
+        GroqLLM._consecutive_failures = 0
+
+    def _record_failure(self):
+        """Count a failed call and open the circuit once the threshold is reached."""
+        GroqLLM._consecutive_failures += 1
+        if GroqLLM._consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
+            GroqLLM._circuit_open_until = time.monotonic() + CIRCUIT_BREAKER_WINDOW
+            GroqLLM._consecutive_failures = 0
+            print(f"⚠️ Groq circuit breaker open for {CIRCUIT_BREAKER_WINDOW}s after repeated failures")
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Delay before retry number attempt (0-based), with jitter so callers don't retry in lockstep."""
+        delay = RETRY_DELAY * (2 ** attempt) if EXPONENTIAL_BACKOFF else RETRY_DELAY
+        return delay + random.random() * RETRY_JITTER
+
+    def _format_error(self, e: Exception) -> str:
+        """Turn an API exception into the fallback text returned to agents."""
+        if isinstance(e, RateLimitError):
+            # Hold further requests until the bucket refills instead of hammering the API
+            self._rate_limiter.drain()
+            return f"Rate limit reached. Using fallback analysis. Call #{self._call_count}"
+        elif isinstance(e, APITimeoutError):
+            return "API Error: request timed out. Using fallback analysis."
+        elif isinstance(e, APIError):
+            return f"API Error: {e}. Using fallback analysis."
+        else:
+            return f"Analysis Error: {e}"
+
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """Put static instructions in a system message so Groq can reuse the cached prompt prefix."""
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        return messages
+
+    def _record_prompt_cache(self, usage):
+        """Track how many prompt tokens Groq served from its prefix cache."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        GroqLLM._prompt_tokens_total += getattr(usage, "prompt_tokens", 0) or 0
+        GroqLLM._prompt_tokens_cached += cached
+        if cached and GroqLLM._prompt_tokens_total:
+            hit_rate = GroqLLM._prompt_tokens_cached / GroqLLM._prompt_tokens_total
+            logger.debug("Groq prompt cache: %d cached tokens, %.0f%% of prompt tokens so far", cached, hit_rate * 100)
+
     def _call(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
         """Call the Groq API with rate limiting and error handling."""
         if not self.groq_client:
             return f"Groq client not available. Using fallback analysis for prompt: {prompt[:100]}..."
+        system_prompt = kwargs.pop("system_prompt", None)
+        temperature = kwargs.pop("temperature", self.temperature)
 
-        current_time = time.time()
-        if current_time - self._last_call_time < 1.0:
-            time.sleep(1.0)
+        # Near-deterministic repeats of a prompt are answered from the cache;
+        # calls with extra request options are always sent to the API
+        cache_key = None
+        if LLM_CACHE_ENABLED and not kwargs and temperature <= LLM_CACHE_MAX_TEMPERATURE:
+            cache_key = ResponseCache.make_key(self.model_name, temperature, self.max_tokens, system_prompt, prompt, stop)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        self._last_call_time = time.time()
-        self._call_count += 1
+        if self._circuit_is_open():
+            return "LLM temporarily unavailable after repeated failures. Using fallback analysis."
+
+        last_error = None
+        for attempt in range(MAX_RETRIES):
+            self._wait_for_rate_limit()
+
+            try:
+                raw_response = self.groq_client.chat.completions.with_raw_response.create(
+                    messages=self._build_messages(prompt, system_prompt),
+                    model=self.model_name,
+                    temperature=temperature,
+                    max_tokens=self.max_tokens,
+                    **kwargs
+                )
+                self._update_rate_limit(raw_response.headers)
+                response = raw_response.parse()
+                if getattr(response, "usage", None) is not None:
+                    self._record_prompt_cache(response.usage)
+
+                result = response.choices[0].message.content
+
+                cut = earliest_stop_index(result, stop)
+                if cut != -1:
+                    result = result[:cut]
 
+                self._record_success()
+                if cache_key is not None and result:
+                    self._response_cache.put(cache_key, result)
+                return result
+
+            except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                # Transient: back off and try again
+                last_error = e
+                if attempt < MAX_RETRIES - 1:
+                    time.sleep(self._backoff_delay(attempt))
+            except Exception as e:
+                self._record_failure()
+                return self._format_error(e)
+
+        self._record_failure()
+        return self._format_error(last_error)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> Iterator[str]:
+        """Stream the Groq completion chunk by chunk as it is generated."""
+        if not self.groq_client:
+            yield f"Groq client not available. Using fallback analysis for prompt: {prompt[:100]}..."
+            return
+        if self._circuit_is_open():
+            yield "LLM temporarily unavailable after repeated failures. Using fallback analysis."
+            return
+
+        self._wait_for_rate_limit()
+
+        stream = None
         try:
-            response = self.groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
+            stream = self.groq_client.chat.completions.create(
+                messages=self._build_messages(prompt, kwargs.pop("system_prompt", None)),
                 model=self.model_name,
-                temperature=self.temperature,
+                temperature=kwargs.pop("temperature", self.temperature),
                 max_tokens=self.max_tokens,
+                stream=True,
                 **kwargs
             )
+            emitted = ""
+            for chunk in stream:
+                content = chunk.choices[0].delta.content
+                if not content:
+                    continue
+                if stop:
+                    text = emitted + content
+                    cut = earliest_stop_index(text, stop)
+                    if cut != -1:
+                        if cut > len(emitted):
+                            yield text[len(emitted):cut]
+                        return
+                    emitted = text
+                yield content
 
-            result = response.choices[0].message.content
+        except Exception as e:
+            yield self._format_error(e)
+        finally:
+            # Release the HTTP response when the consumer stops reading early
+            if stream is not None:
+                stream.close()
+
+    def _call_with_tools(self, prompt: str, tools: List[Dict[str, Any]], **kwargs) -> Optional[Dict[str, Any]]:
+        """Call Groq with native function calling; returns the text content and (name, arguments) tool calls."""
+        if not self.groq_client or self._circuit_is_open():
+            return None
 
-            if stop:
-                for stop_word in stop:
-                    if stop_word in result:
-                        result = result[:result.index(stop_word)]
-                        break
+        self._wait_for_rate_limit()
 
-            return result
+        try:
+            response = self.groq_client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.model_name,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                tools=tools,
+                tool_choice="auto",
+                parallel_tool_calls=True,
+                **kwargs
+            )
+            message = response.choices[0].message
+            tool_calls = [(call.function.name, call.function.arguments) for call in (message.tool_calls or [])]
+            return {"content": message.content or "", "tool_calls": tool_calls}
 
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "rate limit" in error_msg.lower():
-                return f"Rate limit reached. Using fallback analysis. Call #{self._call_count}"
-            elif "API" in error_msg:
-                return f"API Error: {error_msg}. Using fallback analysis."
-            else:
-                return f"Analysis Error: {error_msg}"
\ No newline at end of file
+            return {"content": self._format_error(e), "tool_calls": []}
@@ -1,8 +1,18 @@
 import time
 import os
-import requests
-from typing import Dict, List, Optional, Any
-from .base import BaseLLM
+import httpx
+from typing import Dict, Iterator, List, Optional, Any
+try:
+    import orjson
+except ImportError:  # stdlib json produces the same payloads, just slower
+    import json as orjson
+from agentic_ai.core.config.reliability import (
+    LLM_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    OLLAMA_MIN_REQUEST_INTERVAL,
+)
+from .base import BaseLLM, earliest_stop_index
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
 class OllamaLLM(BaseLLM):
     """Ollama LLM implementation for local LLM inference."""
@@ -12,19 +22,33 @@ class OllamaLLM(BaseLLM):
     max_tokens: int = 1024
     base_url: str = "http://localhost:11434"  # Default Ollama API endpoint
 
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(self, base_url: Optional[str] = None, verify_on_init: bool = False):
         """Initialize the Ollama LLM client.
         
         Args:
             base_url: Optional custom Ollama API endpoint URL.
+            verify_on_init: Probe the server now instead of on the first call.
         """
         self.base_url = base_url or os.getenv("OLLAMA_API_URL", self.base_url)
         self._call_count = 0
         self._last_call_time = 0.0
-        
-        # Verify if Ollama is accessible
+        # Kept open so every call reuses a pooled keep-alive connection to the server
+        self._session = httpx.Client(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+        # OLLAMA_SKIP_PROBE disables the reachability check entirely
+        self._probed = bool(os.getenv("OLLAMA_SKIP_PROBE"))
+        if verify_on_init:
+            self._probe()
+
+    def _probe(self):
+        """Verify once that Ollama is accessible; failures are reported, not raised."""
+        self._probed = True
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self._session.get("/api/tags")
             if response.status_code == 200:
                 print(f"✓ Connected to Ollama server at {self.base_url}")
             else:
@@ -32,49 +56,96 @@ class OllamaLLM(BaseLLM):
         except Exception as e:
             print(f"⚠️ Failed to connect to Ollama server at {self.base_url}: {e}")
 
+    def __del__(self):
+        session = getattr(self, "_session", None)
+        if session is not None:
+            session.close()
+
     @property
     def _llm_type(self) -> str:
         return "ollama"
 
-    def _call(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
-        """Call the Ollama API with error handling."""
-        current_time = time.time()
-        if current_time - self._last_call_time < 0.5:  # Local LLMs can handle more requests
-            time.sleep(0.5)
-
-        self._last_call_time = time.time()
-        self._call_count += 1
-        
-        # Prepare the request payload
+    def _build_payload(self, prompt: str, stream: bool, **kwargs) -> Dict[str, Any]:
+        """Prepare the /api/generate request payload."""
         payload: Dict[str, Any] = {
             "model": kwargs.get("model", self.model_name),
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": kwargs.get("temperature", self.temperature),
                 "num_predict": kwargs.get("max_tokens", self.max_tokens),
             }
         }
+        # Callers' instructions go in Ollama's system field, like the system message of the chat providers
+        if kwargs.get("system_prompt"):
+            payload["system"] = kwargs["system_prompt"]
+        # Ollama's equivalent of the chat APIs' JSON response_format
+        if (kwargs.get("response_format") or {}).get("type") == "json_object":
+            payload["format"] = "json"
+        return payload
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
+        """Call the Ollama API with error handling."""
+        if not self._probed:
+            self._probe()
+
+        # Sleep only for the rest of the interval; monotonic time is immune to clock jumps
+        elapsed = time.monotonic() - self._last_call_time
+        if elapsed < OLLAMA_MIN_REQUEST_INTERVAL:
+            time.sleep(OLLAMA_MIN_REQUEST_INTERVAL - elapsed)
+
+        self._last_call_time = time.monotonic()
+        self._call_count += 1
+        
+        payload = self._build_payload(prompt, False, **kwargs)
         
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate", 
-                json=payload
-            )
+            response = self._session.post("/api/generate", content=orjson.dumps(payload), headers=_JSON_HEADERS)
             
             if response.status_code != 200:
                 return f"Ollama API error: {response.status_code} - {response.text[:100]}"
                 
-            result = response.json().get("response", "")
+            result = orjson.loads(response.content).get("response", "")
             
             # Handle stop sequences if provided
-            if stop:
-                for stop_word in stop:
-                    if stop_word in result:
-                        result = result[:result.index(stop_word)]
-                        break
+            cut = earliest_stop_index(result, stop)
+            if cut != -1:
+                result = result[:cut]
                         
             return result
             
         except Exception as e:
             return f"Ollama Analysis Error: {str(e)}"
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> Iterator[str]:
+        """Stream the Ollama response as it is generated (one JSON object per line)."""
+        if not self._probed:
+            self._probe()
+        payload = self._build_payload(prompt, True, **kwargs)
+        try:
+            with self._session.stream("POST", "/api/generate", content=orjson.dumps(payload),
+                                      headers=_JSON_HEADERS) as response:
+                if response.status_code != 200:
+                    yield f"Ollama API error: {response.status_code}"
+                    return
+                emitted = ""
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    content = chunk.get("response", "")
+                    if content:
+                        if stop:
+                            text = emitted + content
+                            cut = earliest_stop_index(text, stop)
+                            if cut != -1:
+                                if cut > len(emitted):
+                                    yield text[len(emitted):cut]
+                                return
+                            emitted = text
+                        yield content
+                    if chunk.get("done"):
+                        break
+
+        except Exception as e:
+            yield f"Ollama Analysis Error: {str(e)}"
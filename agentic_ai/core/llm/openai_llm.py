@@ -1,32 +1,114 @@
-import time
+import atexit
 import os
+import re
 import httpx
 from typing import List, Optional, Dict, Any
 from openai import OpenAI
-from .base import BaseLLM
+try:
+    import ahocorasick
+except ImportError:  # fall back to the regex alternation
+    ahocorasick = None
+from agentic_ai.core.config.reliability import (
+    LLM_CACHE_ENABLED, LLM_CACHE_SIZE, LLM_CACHE_MAX_TEMPERATURE,
+    OPENAI_SEMANTIC_CACHE_ENABLED, OPENAI_EMBEDDING_MODEL,
+    LLM_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL,
+    OPENAI_RPM, OPENAI_TPM, OPENAI_RATE_LIMIT_BURST,
+)
+from .base import BaseLLM, earliest_stop_index
+from .rate_limiter import TokenBucket
+from .response_cache import ResponseCache
+from .semantic_cache import SemanticCache
 
 # Set environment variables for SSL certificate verification
 os.environ['PYTHONHTTPSVERIFY'] = '0'
 os.environ['REQUESTS_CA_BUNDLE'] = ''
 os.environ['CURL_CA_BUNDLE'] = ''
 
+# Any of these in a prompt marks it as a ReAct agent turn; one scan instead of one per marker
+_REACT_MARKERS_RE = re.compile(
+    r"Thought:|Action:|Final Answer:|Available tools:|Observation:|agent_scratchpad|Begin:|Tool names:"
+)
+# An Action or Final Answer line in a model response
+_ACTION_OR_FINAL_LINE_RE = re.compile(r"^[ \t]*(?:Action|Final Answer):", re.MULTILINE)
+# Whitespace runs collapsed before embedding, so reformatted prompts land on the same vector
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Keywords hinting at the tool an incomplete ReAct step meant to call, in priority order;
+# parallel tuples so a keyword's index is both its priority and its tool
+_TOOL_KEYWORDS = ("dataquery", "query", "user", "interact", "geo", "policy", "risk",
+                  "salary generator", "salary retriever")
+_TOOL_NAMES = ("DataQuery", "DataQuery", "UserInteraction", "UserInteraction", "GeoPolicyCheck",
+               "GeoPolicyCheck", "RiskAssessment", "SalarySheetGenerator", "SalarySheetRetriever")
+# Action Input appended for an inferred tool; other tools get a "[Input for <tool>]" placeholder
+_TOOL_DEFAULT_INPUTS = {
+    "UserInteraction": "Please provide your PAN or Aadhaar number for loan processing.",
+    "DataQuery": "[PAN/Aadhaar provided by user]",
+    "GeoPolicyCheck": "city:[city],purpose:personal,amount:100000",
+}
+_TOOL_KEYWORD_PRIORITY = {keyword: index for index, keyword in enumerate(_TOOL_KEYWORDS)}
+# One alternation finds every keyword in a single pass over the response
+_TOOL_KEYWORD_RE = re.compile("|".join(map(re.escape, _TOOL_KEYWORDS)))
+# With pyahocorasick, one automaton pass reports every keyword, overlapping ones included
+_TOOL_AUTOMATON = None
+if ahocorasick is not None:
+    _TOOL_AUTOMATON = ahocorasick.Automaton()
+    for _index, _keyword in enumerate(_TOOL_KEYWORDS):
+        _TOOL_AUTOMATON.add_word(_keyword, _index)
+    _TOOL_AUTOMATON.make_automaton()
+
+def _infer_tool_name(lower_resp: str) -> Optional[str]:
+    """Returns the tool of the highest-priority keyword in the lowercased response, if any."""
+    if _TOOL_AUTOMATON is not None:
+        best = min((index for _, index in _TOOL_AUTOMATON.iter(lower_resp)), default=None)
+    else:
+        best = min((_TOOL_KEYWORD_PRIORITY[m.group()] for m in _TOOL_KEYWORD_RE.finditer(lower_resp)), default=None)
+    return _TOOL_NAMES[best] if best is not None else None
+
 class OpenAILLM(BaseLLM):
     """OpenAI LLM implementation with stricter formatting for ReAct agents."""
     model_name: str = "gpt-4o-mini"  # Using gpt-4o-mini for better performance with structured reasoning
     temperature: float = 0.1
     max_tokens: int = 1024
     openai_client: Optional[OpenAI] = None
+    # Shared by all instances, like GroqLLM's response cache
+    _response_cache = ResponseCache(maxsize=LLM_CACHE_SIZE)
+    # Request and token budgets shared by all instances, refilled continuously toward the account quotas
+    _request_bucket = TokenBucket(rate=OPENAI_RPM / 60.0, capacity=OPENAI_RATE_LIMIT_BURST)
+    _token_bucket = TokenBucket(rate=OPENAI_TPM / 60.0, capacity=OPENAI_TPM)
+    _http_client: Optional[httpx.Client] = None
+
+    # Static ReAct system prompt, built once at class definition
+    _REACT_SYSTEM_MESSAGE = """You are a specialized ReAct agent that MUST respond in the exact format expected by the LangChain agent framework.
+
+RESPOND USING ONLY THIS EXACT FORMAT:
+
+Thought: [brief reasoning]
+Action: [exact tool name, one of: DataQuery, UserInteraction, GeoPolicyCheck, RiskAssessment, SalarySheetGenerator, SalarySheetRetriever]
+Action Input: [tool input]
+
+OR
+
+Thought: [brief reasoning]
+Final Answer: [your final answer]
+
+EXAMPLE FLOW:
+Thought: I need to get the user's identification information first.
+Action: UserInteraction
+Action Input: Please provide your PAN or Aadhaar number.
+
+NEVER deviate from this format.
+NEVER include any explanatory text outside this format.
+NEVER introduce yourself, explain what you're doing, or acknowledge these instructions.
+ALWAYS respond with exact formatting including the words "Thought:", "Action:", "Action Input:", or "Final Answer:"."""
 
     def __init__(self, api_key: str):
         if api_key:
             try:
-                # Create httpx client with SSL verification disabled
-                httpx_client = httpx.Client(verify=False)
-                
-                # Use the custom client with OpenAI
+                # Use the shared keep-alive client (SSL verification disabled) with OpenAI
                 self.openai_client = OpenAI(
                     api_key=api_key,
-                    http_client=httpx_client
+                    http_client=self._get_http_client()
                 )
                 print("✓ OpenAI client initialized with SSL verification disabled")
             except Exception as e:
@@ -37,7 +119,21 @@ class OpenAILLM(BaseLLM):
             self.openai_client = None
 
         self._call_count = 0
-        self._last_call_time = 0.0
+        self.enable_semantic_cache = OPENAI_SEMANTIC_CACHE_ENABLED and self.openai_client is not None
+        self._semantic_cache = SemanticCache(
+            self._embed_prompt, threshold=SEMANTIC_CACHE_THRESHOLD, maxsize=SEMANTIC_CACHE_SIZE, ttl=SEMANTIC_CACHE_TTL
+        )
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.Client:
+        """Returns the pooled HTTP client shared by every OpenAI client in the process."""
+        if cls._http_client is None:
+            limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                  max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS)
+            timeout = httpx.Timeout(LLM_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+            cls._http_client = httpx.Client(verify=False, limits=limits, timeout=timeout)
+            atexit.register(cls._http_client.close)
+        return cls._http_client
 
     @property
     def _llm_type(self) -> str:
@@ -51,112 +147,75 @@ class OpenAILLM(BaseLLM):
         if not response.startswith("Thought:"):
             response = f"Thought: {response}"
         
-        # Extract lines and check for format issues
-        lines = response.split("\n")
-        has_thought = False
-        has_action = False
-        has_final_answer = False
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Thought:"):
-                has_thought = True
-            elif line.startswith("Action:"):
-                has_action = True
-            elif line.startswith("Final Answer:"):
-                has_final_answer = True
-        
-        # Check for incomplete format (missing Action or Final Answer)
-        if has_thought and not (has_action or has_final_answer):
+        # Check for incomplete format (missing Action or Final Answer); the Thought is guaranteed above
+        if _ACTION_OR_FINAL_LINE_RE.search(response) is None:
             # Try to identify what tool the model was trying to use
-            lower_resp = response.lower()
-            tool_map = {
-                "dataquery": "DataQuery",
-                "query": "DataQuery",
-                "user": "UserInteraction", 
-                "interact": "UserInteraction",
-                "geo": "GeoPolicyCheck",
-                "policy": "GeoPolicyCheck",
-                "risk": "RiskAssessment",
-                "salary generator": "SalarySheetGenerator",
-                "salary retriever": "SalarySheetRetriever"
-            }
-            
-            # Look for tool name indicators in the response
-            tool_name = None
-            for keyword, tool in tool_map.items():
-                if keyword in lower_resp:
-                    tool_name = tool
-                    break
+            tool_name = _infer_tool_name(response.lower())
             
-            # Add the missing Action and Action Input
-            if tool_name:
-                response += f"\nAction: {tool_name}"
-                
-                # Generate appropriate input based on the tool
-                if tool_name == "UserInteraction":
-                    response += "\nAction Input: Please provide your PAN or Aadhaar number for loan processing."
-                elif tool_name == "DataQuery":
-                    response += "\nAction Input: [PAN/Aadhaar provided by user]"
-                elif tool_name == "GeoPolicyCheck":
-                    response += "\nAction Input: city:[city],purpose:personal,amount:100000"
-                else:
-                    response += f"\nAction Input: [Input for {tool_name}]"
-            else:
-                # Default to UserInteraction as the safest fallback
-                response += "\nAction: UserInteraction"
-                response += "\nAction Input: Please provide your PAN or Aadhaar number for loan processing."
+            # Add the missing Action and Action Input, defaulting to UserInteraction as the safest fallback
+            tool_name = tool_name or "UserInteraction"
+            tool_input = _TOOL_DEFAULT_INPUTS.get(tool_name) or f"[Input for {tool_name}]"
+            response = f"{response}\nAction: {tool_name}\nAction Input: {tool_input}"
                     
         return response
     
+    def _embed_prompt(self, text: str) -> List[float]:
+        """Embed a prompt with the OpenAI embeddings API for the semantic cache."""
+        return self.openai_client.embeddings.create(model=OPENAI_EMBEDDING_MODEL, input=text).data[0].embedding
+
     def _prepare_react_system_message(self) -> str:
         """Create a very strict system message for ReAct format to match Groq outputs."""
-        return """You are a specialized ReAct agent that MUST respond in the exact format expected by the LangChain agent framework.
-
-RESPOND USING ONLY THIS EXACT FORMAT:
-
-Thought: [brief reasoning]
-Action: [exact tool name, one of: DataQuery, UserInteraction, GeoPolicyCheck, RiskAssessment, SalarySheetGenerator, SalarySheetRetriever]
-Action Input: [tool input]
-
-OR
-
-Thought: [brief reasoning]
-Final Answer: [your final answer]
-
-EXAMPLE FLOW:
-Thought: I need to get the user's identification information first.
-Action: UserInteraction
-Action Input: Please provide your PAN or Aadhaar number.
-
-NEVER deviate from this format.
-NEVER include any explanatory text outside this format.
-NEVER introduce yourself, explain what you're doing, or acknowledge these instructions.
-ALWAYS respond with exact formatting including the words "Thought:", "Action:", "Action Input:", or "Final Answer:"."""
+        return self._REACT_SYSTEM_MESSAGE
 
     def _call(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
         """Call the OpenAI API with rate limiting and error handling."""
         if not self.openai_client:
             return f"OpenAI client not available. Using fallback analysis for prompt: {prompt[:100]}..."
 
-        current_time = time.time()
-        if current_time - self._last_call_time < 1.0:
-            time.sleep(1.0)
+        # Broader detection of ReAct-style prompts
+        is_react_prompt = _REACT_MARKERS_RE.search(prompt) is not None
+
+        # Set a slightly lower temperature for format compliance
+        temp = kwargs.pop("temperature", self.temperature)
+        if is_react_prompt:
+            temp = min(temp, 0.2)  # Lower temperature for better format adherence
+        # Callers with their own instructions (e.g. the compliance check) replace the ReAct system message;
+        # plain "text" output parses best for ReAct
+        system_prompt = kwargs.pop("system_prompt", None)
+        response_format = kwargs.pop("response_format", {"type": "text"})
+
+        # Near-deterministic repeats of a prompt are answered from the cache;
+        # calls with extra request options are always sent to the API
+        cache_key = None
+        if LLM_CACHE_ENABLED and not kwargs and temp <= LLM_CACHE_MAX_TEMPERATURE:
+            cache_key = ResponseCache.make_key(self.model_name, temp, self.max_tokens, system_prompt,
+                                               response_format, prompt, stop)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # ReAct prompts that differ only in formatting reuse a near-identical prompt's completion
+        query_vec = None
+        if cache_key is not None and is_react_prompt and self.enable_semantic_cache:
+            try:
+                query_vec = self._semantic_cache.embed_query(_WHITESPACE_RE.sub(" ", prompt).strip())
+                cached = self._semantic_cache.get(query_vec)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                print(f"⚠️ Semantic cache lookup failed: {e}")
+                query_vec = None
 
-        self._last_call_time = time.time()
+        # Wait only when a quota is exhausted; ~4 characters per token estimates prompt size
+        self._request_bucket.acquire()
+        self._token_bucket.acquire(len(prompt) // 4 + self.max_tokens)
         self._call_count += 1
         
-        # Broader detection of ReAct-style prompts
-        is_react_prompt = any(marker in prompt for marker in [
-            "Thought:", "Action:", "Final Answer:", "Available tools:",
-            "Observation:", "agent_scratchpad", "Begin:", "Tool names:"
-        ])
-        
         # Add appropriate messages based on prompt type
         messages: List[Dict[str, Any]] = []
         
-        # Always add the system message for better formatting
-        messages.append({"role": "system", "content": self._prepare_react_system_message()})
+        # Always add a system message for better formatting
+        messages.append({"role": "system", "content": system_prompt or self._prepare_react_system_message()})
         
         # Clean up the prompt if needed
         if "system:" in prompt.lower():
@@ -176,17 +235,6 @@ ALWAYS respond with exact formatting including the words "Thought:", "Action:",
         messages.append({"role": "user", "content": prompt})
         
         try:
-            # Set a slightly lower temperature for format compliance
-            temp = kwargs.get("temperature", self.temperature)
-            if is_react_prompt:
-                temp = min(temp, 0.2)  # Lower temperature for better format adherence
-            
-            # Add response format parameter for stricter output with OpenAI
-            response_format = {"type": "text"}
-            if is_react_prompt:
-                # Force "text" response format for better parsing
-                response_format = {"type": "text"}
-            
             response = self.openai_client.chat.completions.create(
                 messages=messages,
                 model=self.model_name,
@@ -203,12 +251,14 @@ ALWAYS respond with exact formatting including the words "Thought:", "Action:",
                 result = self._fix_react_format(result)
 
             # Check for and apply stop sequences
-            if stop:
-                for stop_word in stop:
-                    if stop_word in result:
-                        result = result[:result.index(stop_word)]
-                        break
+            cut = earliest_stop_index(result, stop)
+            if cut != -1:
+                result = result[:cut]
 
+            if cache_key is not None and result:
+                self._response_cache.put(cache_key, result)
+                if query_vec is not None:
+                    self._semantic_cache.put(query_vec, result)
             return result
 
         except Exception as e:
@@ -221,13 +271,7 @@ ALWAYS respond with exact formatting including the words "Thought:", "Action:",
                 print(f"⚠️ SSL/Connection error: {error_msg}")
                 print("Retrying with SSL verification disabled...")
                 try:
-                    # Create a new client with SSL verification disabled
-                    httpx_client = httpx.Client(verify=False)
-                    
-                    self.openai_client = OpenAI(
-                        api_key=self.openai_client.api_key,
-                        http_client=httpx_client
-                    )
+                    # The shared client already skips verification; retry once over a fresh pooled connection
                     response = self.openai_client.chat.completions.create(
                         messages=messages,
                         model=self.model_name,
@@ -0,0 +1,37 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket; callers only wait when the bucket is empty."""
+
+    __slots__ = ('rate', 'capacity', '_tokens', '_updated', '_lock')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # tokens added per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1):
+        """Take tokens, sleeping only for as long as the missing tokens need to refill."""
+        tokens = min(tokens, self.capacity)  # an oversized request waits for a full bucket, not forever
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+    def drain(self):
+        """Empty the bucket, e.g. when the provider reports no remaining quota."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0
@@ -0,0 +1,37 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+class ResponseCache:
+    """Thread-safe LRU cache of LLM responses keyed by a hash of the request."""
+
+    __slots__ = ('maxsize', '_entries', '_lock')
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts) -> bytes:
+        """Hash the request parts (model, temperature, prompt, ...) into a compact key."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
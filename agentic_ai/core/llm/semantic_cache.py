@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+import numpy as np
+
+class SemanticCache:
+    """Thread-safe cache that also answers near-duplicate queries, matched by embedding cosine similarity."""
+
+    __slots__ = ('embed', 'threshold', 'maxsize', 'ttl', '_matrix', '_values', '_stamps', '_lock')
+
+    def __init__(self, embed: Callable[[str], Any], threshold: float = 0.95, maxsize: int = 256,
+                 ttl: Optional[float] = None):
+        self.embed = embed
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl  # seconds an entry stays valid; None keeps entries until evicted by size
+        self._matrix: Optional[np.ndarray] = None  # one L2-normalized row per cached query
+        self._values = []
+        self._stamps = deque()  # insertion time per row, oldest first
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        """Drops entries older than ttl; rows are in insertion order, so they are all at the front."""
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        while self._stamps and self._stamps[0] < cutoff:
+            self._stamps.popleft()
+            expired += 1
+        if expired:
+            del self._values[:expired]
+            self._matrix = self._matrix[expired:] if self._values else None
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embeds and L2-normalizes a query so a dot product is its cosine similarity."""
+        vec = np.asarray(self.embed(text), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, query_vec: np.ndarray) -> Optional[Any]:
+        """Returns the value of the most similar cached query if it clears the threshold."""
+        with self._lock:
+            self._expire()
+            if self._matrix is None:
+                return None
+            scores = self._matrix @ query_vec
+            best = int(scores.argmax())
+            return self._values[best] if scores[best] >= self.threshold else None
+
+    def put(self, query_vec: np.ndarray, value: Any):
+        with self._lock:
+            row = query_vec[np.newaxis, :]
+            if self._matrix is None:
+                self._matrix = row
+            else:
+                self._matrix = np.vstack((self._matrix, row))
+            self._values.append(value)
+            self._stamps.append(time.monotonic())
+            if len(self._values) > self.maxsize:
+                self._matrix = self._matrix[1:]
+                self._values.pop(0)
+                self._stamps.popleft()
@@ -1,17 +1,32 @@
 #agent_executor
 from typing import TypedDict, Annotated, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.agents import AgentAction, AgentFinish
 from langchain_core.messages import BaseMessage, HumanMessage
 from langgraph.prebuilt import ToolExecutor
 from langgraph.graph import StateGraph, END
-from agentic_ai.core.config.loader import LangChainLLMWrapper
+from agentic_ai.core.config.loader import get_shared_llm_wrapper
 from langchain_core.prompts import PromptTemplate
 from agentic_ai.core.config.constants import PROMPT_TEMPLATE_PATH
+from agentic_ai.core.config.reliability import TOOL_CONCURRENCY_LIMIT, NATIVE_TOOL_CALLING
 from agentic_ai.core.config.logger import get_logger
 import json
 import re
  
 logger = get_logger(__name__)
+
+# ReAct output patterns, compiled once for the per-turn parsing below
+_WHITESPACE_RE = re.compile(r"\s+")
+_FINAL_ANSWER_RE = re.compile(r"Final Answer:\s*(.*?)(?:\n|$)", re.DOTALL)
+_ACTION_LINE_RE = re.compile(r"^Action:", re.MULTILINE)
+_ACTION_RE = re.compile(r"Action:\s*(\w+)")
+_ACTION_INPUT_RE = re.compile(r"Action Input:\s*(.+)")
+_THOUGHT_RE = re.compile(r"Thought:\s*(.*?)(?=Action:|$)", re.DOTALL)
+
+# GeoPolicyCheck does not depend on DataQuery, so with TOOL_CONCURRENCY_LIMIT > 1 it is started
+# alongside DataQuery on this pool (shared by every workflow) and its result reused when the agent asks for it
+_PREFETCH_POOL = (ThreadPoolExecutor(max_workers=TOOL_CONCURRENCY_LIMIT - 1, thread_name_prefix="tool-prefetch")
+                  if TOOL_CONCURRENCY_LIMIT > 1 else None)
  
 class AgentState(TypedDict):
     input: str
@@ -39,8 +54,31 @@ class AgentState(TypedDict):
  
 def create_agent_workflow(tools: list):
     tool_executor = ToolExecutor(tools)
+    prefetched_tools = {}
+
+    def tool_key(tool_name, tool_input):
+        return tool_name, _WHITESPACE_RE.sub("", str(tool_input)).lower()
+
+    def invoke_tool(action, state: AgentState):
+        future = prefetched_tools.pop(tool_key(action.tool, action.tool_input), None)
+        if future is not None:
+            print(f"[DEBUG] Using prefetched result for {action.tool}")
+            return future.result()
+        # A prefetch of this tool with different input will never be used: cancel it, or drop it if already running
+        for stale_key in [key for key in prefetched_tools if key[0] == action.tool]:
+            prefetched_tools.pop(stale_key).cancel()
+
+        if _PREFETCH_POOL and action.tool == "DataQuery" and not state.get("steps_completed", {}).get("GeoPolicyCheck"):
+            city, purpose, amount = state.get("city"), state.get("purpose"), state.get("amount")
+            if city and city != "unknown" and purpose and purpose not in ["unknown", "not_detected"] and amount:
+                geo_input = f"city:{city},purpose:{purpose},amount:{amount}"
+                geo_action = AgentAction(tool="GeoPolicyCheck", tool_input=geo_input, log="prefetch")
+                prefetched_tools[tool_key("GeoPolicyCheck", geo_input)] = _PREFETCH_POOL.submit(tool_executor.invoke, geo_action)
+                print(f"[DEBUG] Prefetching GeoPolicyCheck concurrently: {geo_input}")
+
+        return tool_executor.invoke(action)
  
-    llm = LangChainLLMWrapper()
+    llm = get_shared_llm_wrapper()
  
     simple_template = """
 You are a comprehensive loan processing agent. You must complete the FULL loan processing workflow systematically.
@@ -116,6 +154,23 @@ IMPORTANT: Execute the complete loan processing pipeline. Execute one action at
         input_variables=["input", "agent_scratchpad", "tools", "tool_names"],
         template=simple_template
     )
+
+    # Function-calling schema for NATIVE_TOOL_CALLING; every tool keeps its single string input
+    tool_schemas = [
+        {
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {"tool_input": {"type": "string", "description": "Input string for the tool"}},
+                    "required": ["tool_input"],
+                },
+            },
+        }
+        for tool in tools
+    ]
  
     def parse_agent_output(output: str, state: AgentState = None):
         """Parse LLM output to extract action or final answer with simple workflow enforcement."""
@@ -169,7 +224,7 @@ IMPORTANT: Execute the complete loan processing pipeline. Execute one action at
             )
  
         # CRITICAL: Check for Final Answer FIRST - this takes priority over any actions
-        final_answer_match = re.search(r"Final Answer:\s*(.*?)(?:\n|$)", output, re.DOTALL)
+        final_answer_match = _FINAL_ANSWER_RE.search(output)
         if final_answer_match:
             print("[DEBUG] Detected Final Answer in LLM output - terminating workflow.")
             return AgentFinish(
@@ -186,15 +241,15 @@ IMPORTANT: Execute the complete loan processing pipeline. Execute one action at
             )
 
         # Check for multiple actions in a single response (but allow sequential workflow steps)
-        action_count = len(re.findall(r"^Action:", output, re.MULTILINE))
+        action_count = len(_ACTION_LINE_RE.findall(output))
         if action_count > 1:
             print(f"[DEBUG] Detected {action_count} actions in single response - will only execute the first action")
             # Instead of terminating, just take the first action and continue
             # This allows the workflow to proceed naturally
  
         # Look for Action and Action Input (take only the first if multiple)
-        action_matches = re.findall(r"Action:\s*(\w+)", output)
-        input_matches = re.findall(r"Action Input:\s*(.+)", output)
+        action_matches = _ACTION_RE.findall(output)
+        input_matches = _ACTION_INPUT_RE.findall(output)
        
         if action_matches and input_matches:
             # Take only the first action and input
@@ -334,7 +389,24 @@ IMPORTANT: Execute the complete loan processing pipeline. Execute one action at
             tool_names=", ".join(tool_names)
         )
  
-        response_text = llm._call(formatted_prompt)
+        response_text = None
+        if NATIVE_TOOL_CALLING:
+            native = llm.call_with_tools(formatted_prompt, tool_schemas)
+            if native and native["tool_calls"]:
+                # A typed tool call cannot be malformed, so render it straight into the ReAct shape
+                tool_name, arguments = native["tool_calls"][0]
+                try:
+                    tool_input = json.loads(arguments).get("tool_input", "")
+                except (ValueError, AttributeError):
+                    tool_input = arguments
+                if len(native["tool_calls"]) > 1:
+                    print(f"[DEBUG] {len(native['tool_calls'])} tool calls returned, executing the first: {tool_name}")
+                thought = native["content"].strip() or f"I need to execute {tool_name}"
+                response_text = f"Thought: {thought}\nAction: {tool_name}\nAction Input: {tool_input}"
+            elif native and native["content"]:
+                response_text = native["content"]
+        if response_text is None:
+            response_text = llm._call(formatted_prompt)
        
         # Check for context length error
         if "context_length_exceeded" in response_text or "maximum context length" in response_text:
@@ -346,9 +418,9 @@ IMPORTANT: Execute the complete loan processing pipeline. Execute one action at
        
         # Clean format inspired by expected output
         if "Thought:" in response_text and "Action:" in response_text:
-            thought_match = re.search(r"Thought:\s*(.*?)(?=Action:|$)", response_text, re.DOTALL)
-            action_match = re.search(r"Action:\s*(\w+)", response_text)
-            input_match = re.search(r"Action Input:\s*(.+)", response_text)
+            thought_match = _THOUGHT_RE.search(response_text)
+            action_match = _ACTION_RE.search(response_text)
+            input_match = _ACTION_INPUT_RE.search(response_text)
            
             if thought_match and action_match:
                 thought = thought_match.group(1).strip()
@@ -413,7 +485,7 @@ IMPORTANT: Execute the complete loan processing pipeline. Execute one action at
                 "agreement_response": state.get("agreement_response", ""),
             }
        
-        output = tool_executor.invoke(action)
+        output = invoke_tool(action, state)
        
         # NEW: Update state with collected data
         updated_state = {}
@@ -4,14 +4,27 @@ Provides persistent session state that survives interruptions
 """
 import json
 import os
+import time
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional
 import threading
 import atexit
+from agentic_ai.core.config.constants import MAX_CONVERSATION_HISTORY
+
+def _new_session_id() -> str:
+    """loan_<local timestamp>_<8 hex chars>; formats the clock directly rather than via a datetime."""
+    return f"loan_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+def _timestamp() -> str:
+    """Local ISO-8601 timestamp with millisecond precision for session records."""
+    return datetime.now().isoformat(timespec='milliseconds')
 
 class SessionManager:
     """Manages persistent session state for loan applications"""
+
+    # Fixed attribute set: read on every update/save during a conversation
+    __slots__ = ('session_dir', 'session_id', 'session_file', 'state', 'lock')
     
     def __init__(self, session_dir: str = "session_data"):
         self.session_dir = session_dir
@@ -40,12 +53,13 @@ class SessionManager:
                 return self.session_id
             
             # Create new session
-            self.session_id = f"loan_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+            self.session_id = _new_session_id()
             self.session_file = os.path.join(self.session_dir, f"{self.session_id}.json")
             
+            now = _timestamp()
             self.state = {
                 "session_id": self.session_id,
-                "created_at": datetime.now().isoformat(),
+                "created_at": now,
                 "status": "active",
                 "user_request": initial_user_request,
                 "workflow_step": 0,
@@ -53,7 +67,7 @@ class SessionManager:
                 "conversation_history": [],
                 "agent_state": {},
                 "orchestrator_state": {},
-                "last_updated": datetime.now().isoformat()
+                "last_updated": now
             }
             
             self._save_session()
@@ -69,12 +83,13 @@ class SessionManager:
             self.state = {}
             
             # Create new session
-            self.session_id = f"loan_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+            self.session_id = _new_session_id()
             self.session_file = os.path.join(self.session_dir, f"{self.session_id}.json")
             
+            now = _timestamp()
             self.state = {
                 "session_id": self.session_id,
-                "created_at": datetime.now().isoformat(),
+                "created_at": now,
                 "status": "active",
                 "user_request": initial_user_request,
                 "workflow_step": 0,
@@ -82,7 +97,7 @@ class SessionManager:
                 "conversation_history": [],
                 "agent_state": {},
                 "orchestrator_state": {},
-                "last_updated": datetime.now().isoformat()
+                "last_updated": now
             }
             
             self._save_session()
@@ -94,7 +109,7 @@ class SessionManager:
         with self.lock:
             if self.session_id:
                 self.state[key] = value
-                self.state["last_updated"] = datetime.now().isoformat()
+                self.state["last_updated"] = _timestamp()
                 self._save_session()
     
     def get_state(self, key: str, default=None):
@@ -108,7 +123,7 @@ class SessionManager:
             self.state["workflow_step"] = step
             if step_description:
                 self.state["current_step_description"] = step_description
-            self.state["last_updated"] = datetime.now().isoformat()
+            self.state["last_updated"] = _timestamp()
             self._save_session()
     
     def add_conversation_entry(self, speaker: str, message: str):
@@ -117,12 +132,17 @@ class SessionManager:
             if "conversation_history" not in self.state:
                 self.state["conversation_history"] = []
             
-            self.state["conversation_history"].append({
-                "timestamp": datetime.now().isoformat(),
+            now = _timestamp()
+            history = self.state["conversation_history"]
+            history.append({
+                "timestamp": now,
                 "speaker": speaker,
                 "message": message
             })
-            self.state["last_updated"] = datetime.now().isoformat()
+            # Keep the persisted history bounded like the orchestrator's in-memory one
+            if len(history) > MAX_CONVERSATION_HISTORY:
+                del history[:-MAX_CONVERSATION_HISTORY]
+            self.state["last_updated"] = now
             self._save_session()
     
     def update_collected_data(self, data_type: str, value: Any):
@@ -132,7 +152,7 @@ class SessionManager:
                 self.state["collected_data"] = {}
             
             self.state["collected_data"][data_type] = value
-            self.state["last_updated"] = datetime.now().isoformat()
+            self.state["last_updated"] = _timestamp()
             self._save_session()
     
     def update_agent_state(self, agent_name: str, agent_state: Dict):
@@ -142,21 +162,21 @@ class SessionManager:
                 self.state["agent_state"] = {}
             
             self.state["agent_state"][agent_name] = agent_state
-            self.state["last_updated"] = datetime.now().isoformat()
+            self.state["last_updated"] = _timestamp()
             self._save_session()
     
     def update_orchestrator_state(self, orchestrator_state: Dict):
         """Update orchestrator state"""
         with self.lock:
             self.state["orchestrator_state"] = orchestrator_state
-            self.state["last_updated"] = datetime.now().isoformat()
+            self.state["last_updated"] = _timestamp()
             self._save_session()
     
     def complete_session(self, final_result: str = None):
         """Mark session as completed"""
         with self.lock:
             self.state["status"] = "completed"
-            self.state["completed_at"] = datetime.now().isoformat()
+            self.state["completed_at"] = _timestamp()
             if final_result:
                 self.state["final_result"] = final_result
             self._save_session()
@@ -261,7 +281,7 @@ class SessionManager:
         if self.session_id and self.state.get("status") == "active":
             # Mark as interrupted if still active
             self.state["status"] = "interrupted"
-            self.state["interrupted_at"] = datetime.now().isoformat()
+            self.state["interrupted_at"] = _timestamp()
             self._save_session()
 
 # Global session manager instance
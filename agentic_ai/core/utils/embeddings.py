@@ -0,0 +1,48 @@
+#embeddings.py
+# Process-wide sentence embedding model shared by every semantic consumer
+import threading
+from typing import TYPE_CHECKING, List
+from agentic_ai.core.config.constants import EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_ONNX_FILE
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+_sentence_transformer_model = None
+_sentence_transformer_lock = threading.Lock()  # the orchestrator may warm the model from a background thread
+
+def load_sentence_transformer() -> "SentenceTransformer":
+    """Loads the embedding model, using the quantized ONNX export when EMBEDDING_BACKEND=onnx."""
+    # Imported here so importing this module doesn't pull in torch
+    from sentence_transformers import SentenceTransformer
+    if EMBEDDING_BACKEND == "onnx":
+        try:
+            return SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx",
+                                       model_kwargs={"file_name": EMBEDDING_ONNX_FILE})
+        except Exception as e:
+            print(f"[DEBUG] ONNX embedding model unavailable, using PyTorch weights: {str(e)}")
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+def get_sentence_transformer_model():
+    """
+    Get or initialize the shared sentence transformer model.
+    Uses lazy loading for efficiency; returns None if the model cannot be loaded.
+    """
+    global _sentence_transformer_model
+    if _sentence_transformer_model is None:
+        with _sentence_transformer_lock:
+            if _sentence_transformer_model is None:
+                try:
+                    _sentence_transformer_model = load_sentence_transformer()
+                    print("[DEBUG] SentenceTransformer model loaded successfully")
+                except Exception as e:
+                    print(f"[DEBUG] Error loading SentenceTransformer model: {str(e)}")
+                    return None
+    return _sentence_transformer_model
+
+def encode_batch(texts: List[str], normalize: bool = True) -> "np.ndarray":
+    """Encodes texts with the shared model in batches, rather than one encode call per text."""
+    model = get_sentence_transformer_model()
+    if model is None:
+        raise RuntimeError("SentenceTransformer model is not available")
+    return model.encode(texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=normalize)
@@ -5,9 +5,14 @@ import json
 import numpy as np
 import os
 import logging
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from agentic_ai.core.config.constants import AVAILABLE_CITIES
+# The model is shared with the purpose assessment agent and the compliance cache
+from agentic_ai.core.utils.embeddings import get_sentence_transformer_model
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # Suppress SentenceTransformer progress bars and reduce logging
 logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
@@ -133,7 +138,30 @@ def extract_purpose_with_regex_fallback(user_input: str, predefined_purposes: li
    
     return "unknown"
  
-def find_best_matching_purpose_enhanced(user_input: str, model: SentenceTransformer, predefined_purposes: list, threshold: float = 0.45) -> str:
+# General conversation phrases used to filter out non-purpose input
+NON_PURPOSE_PHRASES = (
+    "hello", "hi there", "how are you", "what's up", "good morning",
+    "good afternoon", "nice to meet you", "how's it going", "what can you do",
+    "thanks", "thank you", "bye", "goodbye", "see you later"
+)
+
+def _normalize_rows(embeddings) -> np.ndarray:
+    """L2-normalizes embeddings (float32) so cosine similarity becomes a plain dot product."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1.0, norms)
+
+@lru_cache(maxsize=32)
+def _phrase_embeddings(model: "SentenceTransformer", phrases: tuple) -> np.ndarray:
+    """Normalized embeddings of a static phrase set, encoded once per model."""
+    return _normalize_rows(model.encode(list(phrases)))
+
+@lru_cache(maxsize=256)
+def _encode_normalized(model: "SentenceTransformer", text: str) -> np.ndarray:
+    """Normalized embedding of one input; short purpose strings repeat across requests."""
+    return _normalize_rows(model.encode(text))
+
+def find_best_matching_purpose_enhanced(user_input: str, model: "SentenceTransformer", predefined_purposes: list, threshold: float = 0.45) -> str:
     """
     Enhanced version of find_best_matching_purpose with better semantic matching and context awareness.
     """
@@ -143,31 +171,19 @@ def find_best_matching_purpose_enhanced(user_input: str, model: SentenceTransfor
         # Create enhanced purpose descriptions for better matching
         enhanced_purposes = create_enhanced_purpose_descriptions(predefined_purposes)
        
-        # Encode the user input
-        user_embedding = model.encode([user_input])
-       
-        # General conversation filtering
-        non_purpose_phrases = [
-            "hello", "hi there", "how are you", "what's up", "good morning",
-            "good afternoon", "nice to meet you", "how's it going", "what can you do",
-            "thanks", "thank you", "bye", "goodbye", "see you later"
-        ]
+        # Encode the user input (normalized, so dot products below are cosine similarities)
+        user_embedding = _encode_normalized(model, user_input)
        
         # Check if input is closer to general conversation
-        non_purpose_embeddings = model.encode(non_purpose_phrases)
-        # Compute cosine similarity properly
-        non_purpose_similarities = cosine_similarity(user_embedding, non_purpose_embeddings)[0]
+        non_purpose_similarities = _phrase_embeddings(model, NON_PURPOSE_PHRASES) @ user_embedding
         max_non_purpose_similarity = np.max(non_purpose_similarities)
        
         if max_non_purpose_similarity > 0.7:
             print(f"[DEBUG] Input appears to be general conversation (similarity: {max_non_purpose_similarity:.4f})")
             return "not_detected"
        
-        # Encode the enhanced purpose descriptions
-        purpose_embeddings = model.encode(enhanced_purposes)
-       
-        # Calculate cosine similarity properly
-        similarities = cosine_similarity(user_embedding, purpose_embeddings)[0]
+        # Enhanced purpose descriptions are static, so their embeddings are computed once
+        similarities = _phrase_embeddings(model, tuple(enhanced_purposes)) @ user_embedding
        
         # Find top matches for debugging
         top_indices = np.argsort(similarities)[::-1][:5]
@@ -249,6 +265,39 @@ def extract_json_from_string(text: str) -> dict:
    
     return {}
  
+def collect_json_from_stream(chunks) -> str:
+    """
+    Accumulates streamed LLM text and stops reading as soon as the first
+    top-level JSON object is closed, so trailing output is never waited for.
+    """
+    parts = []
+    depth = 0
+    started = False
+    in_string = False
+    escaped = False
+    for chunk in chunks:
+        parts.append(chunk)
+        for ch in chunk:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '{':
+                depth += 1
+                started = True
+            elif not started:
+                continue
+            elif ch == '"':
+                in_string = True
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return "".join(parts)
+    return "".join(parts)
+ 
 def parse_initial_user_request(user_input: str) -> dict:
     """
     Parses the initial user request to extract loan purpose, amount, and city.
@@ -353,32 +402,13 @@ def parse_initial_user_request(user_input: str) -> dict:
    
     return {"purpose": loan_purpose, "amount": loan_amount, "city": loan_city}
  
-def find_best_matching_purpose(user_input: str, model: SentenceTransformer, predefined_purposes: list, threshold: float = 0.65) -> str:
+def find_best_matching_purpose(user_input: str, model: "SentenceTransformer", predefined_purposes: list, threshold: float = 0.65) -> str:
     """
     Legacy function for backward compatibility.
     Redirects to the enhanced version with adjusted threshold.
     """
     return find_best_matching_purpose_enhanced(user_input, model, predefined_purposes, threshold)
  
-# Initialize the sentence transformer model (load only once for efficiency)
-_sentence_transformer_model = None
- 
-def get_sentence_transformer_model():
-    """
-    Get or initialize the sentence transformer model.
-    Uses lazy loading for efficiency.
-    """
-    global _sentence_transformer_model
-    if _sentence_transformer_model is None:
-        try:
-            # Use a smaller but efficient model for faster inference
-            _sentence_transformer_model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
-            print("[DEBUG] SentenceTransformer model loaded successfully")
-        except Exception as e:
-            print(f"[DEBUG] Error loading SentenceTransformer model: {str(e)}")
-            return None
-    return _sentence_transformer_model
-
 def parse_amount_string(amount_str):
     """
     Parse amount strings like '5 lakhs', '2 crores', '50000' to numeric values.
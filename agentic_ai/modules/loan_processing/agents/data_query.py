@@ -3,24 +3,54 @@ import requests
 import os
 import jwt
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from agentic_ai.core.agent.base_agent import BaseAgent
+from agentic_ai.core.config.reliability import HTTP_MAX_KEEPALIVE_CONNECTIONS
 from agentic_ai.modules.loan_processing.services.loan_data_service import LoanDataService
 from agentic_ai.core.utils.formatting import format_indian_commas
 
+@lru_cache(maxsize=1)
+def _kong_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """Kong consumer key and secret, read from the environment once.
+
+    Call _kong_credentials.cache_clear() after changing them at runtime.
+    """
+    return os.getenv("KONG_JWT_KEY"), os.getenv("KONG_JWT_SECRET")
+
+@lru_cache(maxsize=1)
+def _kong_session() -> requests.Session:
+    """Keep-alive session shared by all Kong Gateway calls, so lookups reuse pooled connections."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=HTTP_MAX_KEEPALIVE_CONNECTIONS))
+    return session
+
 class DataQueryAgent(BaseAgent):
     """Specialized agent for data querying."""
 
+    # Runs identity API lookups speculatively, before the workflow issues the DataQuery call
+    _prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="data-prefetch")
+
     def __init__(self, data_service: LoanDataService):
         super().__init__()
         self.data_service = data_service
+        self._prefetched: Dict[Tuple[str, str], Future] = {}
+
+    def prefetch(self, pan: Optional[str] = None, aadhaar: Optional[str] = None):
+        """Starts the credit score and Aadhaar detail API calls for identifiers the user has consented to."""
+        if pan and ("credit", pan) not in self._prefetched:
+            self._prefetched[("credit", pan)] = self._prefetch_pool.submit(self.fetch_credit_score_from_api, pan)
+        if aadhaar and ("aadhaar", aadhaar) not in self._prefetched:
+            self._prefetched[("aadhaar", aadhaar)] = self._prefetch_pool.submit(self.fetch_aadhaar_details_from_api, aadhaar)
 
     def _format_currency(self, amount):
         return format_indian_commas(amount)
 
     def _get_jwt_token(self):
         """Generate a short-lived JWT token dynamically for Kong Gateway authentication."""
-        key = os.getenv("KONG_JWT_KEY")
-        secret = os.getenv("KONG_JWT_SECRET")
+        key, secret = _kong_credentials()
 
         if not key or not secret:
             raise ValueError("KONG_JWT_KEY and KONG_JWT_SECRET must be set in the environment.")
@@ -45,7 +75,7 @@ class DataQueryAgent(BaseAgent):
                 "Authorization": f"Bearer {self._get_jwt_token()}",
                 "Content-Type": "application/json"
             }
-            response = requests.post(
+            response = _kong_session().post(
                 "http://kong-gateway:8000/credit/get_credit_score",
                 json={"pan_number": pan_number},
                 headers=headers,
@@ -66,7 +96,7 @@ class DataQueryAgent(BaseAgent):
                 "Authorization": f"Bearer {self._get_jwt_token()}",
                 "Content-Type": "application/json"
             }
-            response = requests.post(
+            response = _kong_session().post(
                 "http://kong-gateway:8000/aadhaar/get_aadhaar_details",
                 json={"aadhaar_number": aadhaar_number},
                 headers=headers,
@@ -142,10 +172,8 @@ class DataQueryAgent(BaseAgent):
                     aadhaar = identifier
 
             if pan and not aadhaar:
-                user_row = self.data_service.df[self.data_service.df['pan_number'] == pan]
-                if not user_row.empty:
-                    aadhaar = user_row.iloc[0]['aadhaar_number']
-                else:
+                aadhaar = self.data_service.get_aadhaar_by_pan(pan)
+                if not aadhaar:
                     print(f"💭 Thought: PAN {pan} not found in records. This appears to be a new user.")
                     print("=" * 50 + "\n")
                     return json.dumps({
@@ -160,10 +188,20 @@ class DataQueryAgent(BaseAgent):
             else:
                 return json.dumps({"error": "No valid Aadhaar found for user data lookup."})
 
+            # Credit score and Aadhaar details come from independent APIs, so fetch them concurrently,
+            # reusing any lookup already started while the user was answering prompts
+            credit_future = self._prefetched.pop(("credit", pan), None) if pan else None
+            details_future = self._prefetched.pop(("aadhaar", aadhaar), None) if aadhaar else None
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                if pan and credit_future is None:
+                    credit_future = executor.submit(self.fetch_credit_score_from_api, pan)
+                if aadhaar and details_future is None:
+                    details_future = executor.submit(self.fetch_aadhaar_details_from_api, aadhaar)
+
             # Fetch credit score securely
             api_credit_score = None
             if pan:
-                api_credit_score = self.fetch_credit_score_from_api(pan)
+                api_credit_score = credit_future.result()
                 print(f"[API] Credit score for PAN {pan}: {api_credit_score}")
                 if api_credit_score is not None:
                     user_data['api_credit_score'] = api_credit_score
@@ -174,7 +212,7 @@ class DataQueryAgent(BaseAgent):
             # Fetch Aadhaar details securely
             api_personal_details = None
             if aadhaar:
-                api_personal_details = self.fetch_aadhaar_details_from_api(aadhaar)
+                api_personal_details = details_future.result()
                 if api_personal_details:
                     print(f"[API] Personal details for Aadhaar {aadhaar}: {api_personal_details['name']}, {api_personal_details['age']} years, {api_personal_details['gender']}, Address: {api_personal_details.get('address', 'N/A')}")
                     user_data['api_personal_details'] = api_personal_details
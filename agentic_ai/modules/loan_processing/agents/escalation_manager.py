@@ -1,9 +1,17 @@
 import json
+import re
 import time
 from typing import Any, Dict, List, Callable
 from datetime import datetime
 from agentic_ai.modules.loan_processing.agents.human_agent import get_human_agent
  
+# Phrases marking an agent response as a failure, matched case-insensitively in one pass
+_FAILURE_INDICATORS_RE = re.compile(
+    r"error occurred|failed to process|could not understand|invalid input|parsing error"
+    r"|llm parsing for identifier failed|chain error|timeout|connection error|service unavailable",
+    re.IGNORECASE,
+)
+
 class EscalationManager:
     """
     Manages automatic retry logic and escalation to human agents when
@@ -119,23 +127,8 @@ class EscalationManager:
         if not response:
             return True
            
-        failure_indicators = [
-            "error occurred",
-            "failed to process",
-            "could not understand",
-            "invalid input",
-            "parsing error",
-            "llm parsing for identifier failed",
-            "chain error",
-            "timeout",
-            "connection error",
-            "service unavailable"
-        ]
-       
-        response_lower = response.lower()
-        for indicator in failure_indicators:
-            if indicator in response_lower:
-                return True
+        if _FAILURE_INDICATORS_RE.search(response):
+            return True
                
         # Check for JSON error responses
         try:
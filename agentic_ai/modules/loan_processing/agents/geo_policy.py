@@ -3,9 +3,12 @@ import re
 import os
 from typing import Dict, Any, Optional
 from agentic_ai.core.agent.base_agent import BaseAgent
-from agentic_ai.core.utils.parsing import extract_json_from_string
+from agentic_ai.core.utils.parsing import extract_json_from_string, collect_json_from_stream
 from agentic_ai.core.utils.formatting import format_indian_commas
 
+# Cities we serve, as a set so the city check is a single hash lookup
+SERVICED_CITIES = frozenset({'mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'hyderabad', 'pune', 'ahmedabad', 'surat', 'jaipur'})
+
 class GeoPolicyAgent(BaseAgent):
     """Specialized agent for geographic policy validation."""
     
@@ -101,11 +104,12 @@ class GeoPolicyAgent(BaseAgent):
             category_info = ""
             if purpose_policy:
                 category_info = f"\nLoan Category: {purpose_policy.get('category', 'N/A')}"
-                
-            parsing_prompt = f"""
-You are a loan policy expert. Parse this geographic policy validation request:
 
-Query: "{query}"
+            # Parsing and the policy decision are answered in a single completion
+            policy_prompt = f"""
+You are a senior loan policy officer. Parse this geographic policy validation request and make a geographic policy decision for it:
+
+Query: "{query}"{category_info}
 
 Extract and validate:
 1. City name
@@ -114,27 +118,44 @@ Extract and validate:
 
 Indian cities we serve: Mumbai, Delhi, Bangalore, Chennai, Kolkata, Hyderabad, Pune, Ahmedabad, Surat, Jaipur
 
+Then evaluate if this loan should proceed based on geographical policy considerations.
+Your decision should weigh:
+- The maximum allowable loan amount for the specified city.
+- Any specific conditions or restrictions associated with the loan purpose.
+- General policy guidelines and risk factors.
+
 You MUST respond ONLY with a valid JSON object in the EXACT format shown below:
 
 {{
-    "city": "extracted_city",
-    "purpose": "normalized_purpose",
-    "amount": numeric_amount,
-    "valid_request": true,
-    "errors": []
+    "parsed": {{
+        "city": "extracted_city",
+        "purpose": "normalized_purpose",
+        "amount": numeric_amount,
+        "valid_request": true,
+        "errors": []
+    }},
+    "policy": {{
+        "policy_decision": "APPROVED/CONDITIONAL/REJECTED",
+        "max_allowed_amount": numeric_value,
+        "conditions": ["list", "of", "conditions"],
+        "reasoning": "detailed explanation"
+    }}
 }}
 
-Ensure all fields are present, with "city" as a string, "purpose" as a string, "amount" as a numeric value, "valid_request" as a boolean, and "errors" as an array of strings (empty if valid_request is true).
-DO NOT include any text or explanation outside of the JSON.
-{category_info}
+In "parsed": "city" and "purpose" are strings, "amount" is a numeric value, "valid_request" is a boolean, and "errors" is an array of strings (empty if valid_request is true).
+In "policy": use ONLY one of "APPROVED", "CONDITIONAL", or "REJECTED" for policy_decision; max_allowed_amount must be a number (no commas or currency symbols); conditions must be an array of strings; reasoning must provide a clear explanation for the decision.
+DO NOT include any text, explanation, or markdown formatting outside of the JSON object.
 """
             try:
-                parsing_result = self.llm._call(parsing_prompt)
-                parsed_data = extract_json_from_string(parsing_result)
+                # Stream the completion and stop reading once the JSON object is closed
+                policy_result = collect_json_from_stream(self.llm.stream_response(policy_prompt))
+                combined_result = extract_json_from_string(policy_result)
+                parsed_data = combined_result.get("parsed") if isinstance(combined_result.get("parsed"), dict) else {}
+                policy_decision = combined_result.get("policy") if isinstance(combined_result.get("policy"), dict) else {}
 
                 # Validate that parsed_data has all required fields
                 if not parsed_data:
-                    print(f"⚠️ Empty parsing result or extraction failed. Raw result: {parsing_result}")
+                    print(f"⚠️ Empty parsing result or extraction failed. Raw result: {policy_result}")
                     # Check if the input follows the expected format - city:name,purpose:type,amount:value
                     format_check = re.search(r'city:([^,]+),purpose:([^,]+),amount:(\d+)', query)
                     
@@ -176,7 +197,7 @@ DO NOT include any text or explanation outside of the JSON.
             amount = parsed_data.get("amount", 0)
             
             # Strict validation for required fields - no more guessing or defaults
-            if city == "Unknown" or city.lower() not in ['mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'hyderabad', 'pune', 'ahmedabad', 'surat', 'jaipur']:
+            if city == "Unknown" or str(city).strip().lower() not in SERVICED_CITIES:
                 return json.dumps({
                     "error": "Missing or invalid city",
                     "status": "rejected",
@@ -197,47 +218,12 @@ DO NOT include any text or explanation outside of the JSON.
                     "action_required": "Please ask the user for a valid loan amount explicitly."
                 })
 
-            # Import formatting utility
-            from agentic_ai.core.utils.formatting import format_indian_currency_without_decimal
-            
-            policy_prompt = f"""
-You are a senior loan policy officer. Make a geographic policy decision for this loan:
-
-City: {city}
-Loan Purpose: {purpose}{category_info}
-Loan Amount: {format_indian_currency_without_decimal(amount)}
-
-Please evaluate if this loan should proceed based on geographical policy considerations.
-Your decision should weigh:
-- The maximum allowable loan amount for the specified city.
-- Any specific conditions or restrictions associated with the loan purpose.
-- General policy guidelines and risk factors.
-
-You MUST respond ONLY with a valid JSON object in the EXACT format below:
-
-{{
-    "policy_decision": "APPROVED/CONDITIONAL/REJECTED",
-    "max_allowed_amount": numeric_value,
-    "conditions": ["list", "of", "conditions"],
-    "reasoning": "detailed explanation"
-}}
-
-For policy_decision, use ONLY one of these three values: "APPROVED", "CONDITIONAL", or "REJECTED"
-Max_allowed_amount must be a number (no commas or currency symbols)
-Conditions must be an array of strings
-Reasoning must provide a clear explanation for the decision
-
-DO NOT include any text, explanation, or markdown formatting outside of the JSON object.
-"""
             try:
                 # Print a visual separator to highlight geo policy assessment
                 print("\n" + "=" * 50)
                 print("🌎 GEO POLICY ASSESSMENT")
                 print(f"📍 City: {city} | 🏦 Purpose: {purpose} | 💰 Amount: {format_indian_commas(amount)}")
-                
-                policy_result = self.llm._call(policy_prompt)
                 print(f"💭 Policy Reasoning: Processing geographic eligibility...")
-                policy_decision = extract_json_from_string(policy_result)
                 
                 # Validate that policy_decision has all required fields
                 required_fields = ["policy_decision", "max_allowed_amount", "conditions", "reasoning"]
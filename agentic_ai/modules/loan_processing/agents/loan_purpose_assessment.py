@@ -13,12 +13,14 @@ Implementation uses SentenceTransformer for semantic matching.
 import os
 import json
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from agentic_ai.core.agent.base_agent import BaseAgent
+from agentic_ai.core.config.constants import EMBEDDING_MODEL_NAME
+from agentic_ai.core.utils.embeddings import encode_batch
 
 # Suppress SentenceTransformer progress bars and reduce logging
 logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
@@ -30,6 +32,47 @@ tqdm.tqdm.disable = True
 
 logger = logging.getLogger(__name__)
 
+# Explicit keyword mappings for better accuracy, checked before semantic matching
+_PURPOSE_KEYWORDS = {
+    'vehicle purchase': [
+        'bike loan', 'motorcycle loan', 'scooter loan', 'motorbike loan',
+        'car loan', 'auto loan', 'vehicle loan', 'two wheeler loan',
+        'four wheeler loan', 'truck loan', 'bus loan', 'tractor loan',
+        'vehicle purchase', 'vehicle financing', 'automobile loan',
+        'bike', 'motorcycle', 'scooter', 'car', 'truck', 'vehicle'
+    ],
+    'home purchase': [
+        'home loan', 'house loan', 'property loan', 'home purchase',
+        'real estate', 'apartment loan', 'housing loan', 'flat loan'
+    ],
+    'education': [
+        'education loan', 'student loan', 'study loan', 'tuition fee',
+        'college fee', 'university fee', 'education', 'studies'
+    ],
+    'medical emergency': [
+        'medical emergency', 'hospital bill', 'surgery', 'treatment',
+        'medical expense', 'health emergency', 'doctor bill'
+    ],
+    'business expansion': [
+        'business loan', 'business expansion', 'working capital',
+        'business growth', 'startup loan', 'msme loan'
+    ],
+    'marriage': [
+        'marriage', 'wedding', 'marriage ceremony', 'wedding expense'
+    ],
+    'travel': [
+        'travel', 'vacation', 'holiday', 'trip', 'tour'
+    ]
+}
+
+# Keyword phrases become columns of a category x keyword matrix, so scoring an input is one product
+_KEYWORD_CATEGORIES = list(_PURPOSE_KEYWORDS)
+_KEYWORDS = list(dict.fromkeys(k for keywords in _PURPOSE_KEYWORDS.values() for k in keywords))
+_KEYWORD_INDEX: Dict[str, int] = {keyword: column for column, keyword in enumerate(_KEYWORDS)}
+_KEYWORD_WEIGHTS = np.zeros((len(_KEYWORD_CATEGORIES), len(_KEYWORDS)), dtype=np.float32)
+for _row, _keywords in enumerate(_PURPOSE_KEYWORDS.values()):
+    _KEYWORD_WEIGHTS[_row, [_KEYWORD_INDEX[k] for k in _keywords]] = 1.0
+
 class LoanPurposeAssessmentAgent(BaseAgent):
     """
     Agent that analyzes loan purpose statements and classifies them
@@ -39,26 +82,30 @@ class LoanPurposeAssessmentAgent(BaseAgent):
     match user inputs to predefined categories.
     """
     
+    # Policy and category embeddings are static, so every instance
+    # (one per orchestrator, i.e. per CLI/API request) shares a single copy
+    _shared_resources = None
+    _resources_lock = threading.Lock()
+
     def __init__(self):
         super().__init__()
-        self.model = self._load_sentence_transformer()
-        self.policy_data = self._load_policy_data()
-        self.purpose_categories = list(self.policy_data.keys())
-        self.purpose_embeddings = self._precompute_embeddings()
+        with LoanPurposeAssessmentAgent._resources_lock:
+            if LoanPurposeAssessmentAgent._shared_resources is None:
+                self.policy_data = self._load_policy_data()
+                self.purpose_categories = list(self.policy_data.keys())
+                self.purpose_embeddings = self._load_frozen_embeddings()
+                if self.purpose_embeddings is None:
+                    # Encoded in memory only; scripts/build_purpose_embeddings.py writes the file
+                    self.purpose_embeddings = self._precompute_embeddings()
+                LoanPurposeAssessmentAgent._shared_resources = (
+                    self.policy_data, self.purpose_categories, self.purpose_embeddings
+                )
+            else:
+                self.policy_data, self.purpose_categories, self.purpose_embeddings = (
+                    LoanPurposeAssessmentAgent._shared_resources
+                )
         self.similarity_threshold = 0.6  # Minimum similarity score required for a match
-        
-    def _load_sentence_transformer(self) -> SentenceTransformer:
-        """Load the sentence transformer model."""
-        try:
-            # Use a smaller model for efficiency if memory is a concern
-            return SentenceTransformer('paraphrase-MiniLM-L6-v2')
-            
-            # For better accuracy, use this instead
-            # return SentenceTransformer('all-MiniLM-L12-v2')
-        except Exception as e:
-            logger.error(f"Error loading SentenceTransformer: {e}")
-            raise RuntimeError(f"Failed to load SentenceTransformer: {e}")
-    
+
     def _load_policy_data(self) -> Dict:
         """Load the loan purpose policy data from JSON."""
         try:
@@ -79,11 +126,74 @@ class LoanPurposeAssessmentAgent(BaseAgent):
     def _precompute_embeddings(self) -> np.ndarray:
         """Precompute embeddings for all purpose categories for faster matching."""
         try:
-            return self.model.encode(self.purpose_categories)
+            return encode_batch(self.purpose_categories, normalize=False)
         except Exception as e:
             logger.error(f"Error precomputing embeddings: {e}")
             raise RuntimeError(f"Failed to compute embeddings: {e}")
     
+    @staticmethod
+    def _frozen_embeddings_path() -> str:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(os.path.dirname(current_dir), 'data', 'loan_purpose_embeddings.npz')
+
+    def _load_frozen_embeddings(self) -> Optional[np.ndarray]:
+        """Load the category embeddings built by scripts/build_purpose_embeddings.py; None if missing or stale."""
+        path = self._frozen_embeddings_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                # Re-encode if the policy categories or the embedding model changed
+                if data['labels'].tolist() != self.purpose_categories or str(data['model']) != EMBEDDING_MODEL_NAME:
+                    logger.info("Saved purpose embeddings are stale, recomputing")
+                    return None
+                return data['emb']
+        except Exception as e:
+            logger.warning(f"Could not load saved purpose embeddings: {e}")
+            return None
+
+    def _keyword_match(self, user_purpose: str) -> Optional[str]:
+        """Match a purpose statement to a category by explicit keywords."""
+        # Mark which keyword phrases occur in the text (as substrings, so 'travelling' and 'motorbike'
+        # still hit), then score every category with one product
+        user_purpose_lower = user_purpose.lower()
+        present = np.fromiter((keyword in user_purpose_lower for keyword in _KEYWORDS),
+                              dtype=np.float32, count=len(_KEYWORDS))
+        scores = _KEYWORD_WEIGHTS @ present
+        
+        # First category (in mapping order) with a hit wins, as long as the policy defines it
+        for row in np.flatnonzero(scores):
+            category = _KEYWORD_CATEGORIES[row]
+            if category in self.purpose_categories:
+                logger.debug(f"Keyword match: '{user_purpose}' matched {int(scores[row])} keyword(s) -> '{category}'")
+                return category
+        return None
+
+    def _semantic_match_batch(self, user_purposes: List[str]) -> List[Optional[str]]:
+        """Match purpose statements to categories by embedding similarity, encoding them in one pass."""
+        # Encode the user's purpose descriptions together
+        user_embeddings = encode_batch(user_purposes, normalize=False)
+        
+        # Calculate cosine similarity between every input and all categories
+        similarities = np.dot(user_embeddings, self.purpose_embeddings.T)
+        
+        matches = []
+        for user_purpose, row in zip(user_purposes, similarities):
+            # Find the index of the highest similarity score
+            best_match_idx = np.argmax(row)
+            best_match_score = row[best_match_idx]
+            logger.debug(f"Semantic match: '{self.purpose_categories[best_match_idx]}' with score {best_match_score}")
+            
+            # Check if the match meets our threshold
+            if best_match_score >= self.similarity_threshold:
+                logger.debug(f"Using semantic match: '{user_purpose}' -> '{self.purpose_categories[best_match_idx]}'")
+                matches.append(self.purpose_categories[best_match_idx])
+            else:
+                # No good match found
+                logger.debug(f"No good match found for: '{user_purpose}'")
+                matches.append(None)
+        return matches
+
     def _match_purpose_category(self, user_purpose: str) -> Optional[str]:
         """
         Match user's purpose statement to a predefined category.
@@ -96,74 +206,34 @@ class LoanPurposeAssessmentAgent(BaseAgent):
         """
         try:
             # STEP 1: Enhanced keyword-based matching for better accuracy
-            user_purpose_lower = user_purpose.lower().strip()
-            
-            # Define explicit keyword mappings for better accuracy
-            keyword_mappings = {
-                'vehicle purchase': [
-                    'bike loan', 'motorcycle loan', 'scooter loan', 'motorbike loan',
-                    'car loan', 'auto loan', 'vehicle loan', 'two wheeler loan',
-                    'four wheeler loan', 'truck loan', 'bus loan', 'tractor loan',
-                    'vehicle purchase', 'vehicle financing', 'automobile loan',
-                    'bike', 'motorcycle', 'scooter', 'car', 'truck', 'vehicle'
-                ],
-                'home purchase': [
-                    'home loan', 'house loan', 'property loan', 'home purchase',
-                    'real estate', 'apartment loan', 'housing loan', 'flat loan'
-                ],
-                'education': [
-                    'education loan', 'student loan', 'study loan', 'tuition fee',
-                    'college fee', 'university fee', 'education', 'studies'
-                ],
-                'medical emergency': [
-                    'medical emergency', 'hospital bill', 'surgery', 'treatment',
-                    'medical expense', 'health emergency', 'doctor bill'
-                ],
-                'business expansion': [
-                    'business loan', 'business expansion', 'working capital',
-                    'business growth', 'startup loan', 'msme loan'
-                ],
-                'marriage': [
-                    'marriage', 'wedding', 'marriage ceremony', 'wedding expense'
-                ],
-                'travel': [
-                    'travel', 'vacation', 'holiday', 'trip', 'tour'
-                ]
-            }
-            
-            # Check for explicit keyword matches first
-            for category, keywords in keyword_mappings.items():
-                if category in self.purpose_categories:  # Ensure category exists in policy
-                    for keyword in keywords:
-                        if keyword in user_purpose_lower:
-                            logger.debug(f"Keyword match: '{user_purpose}' matched '{keyword}' -> '{category}'")
-                            return category
+            category = self._keyword_match(user_purpose)
+            if category:
+                return category
             
             # STEP 2: If no keyword match, fall back to semantic similarity
-            # Encode the user's purpose description
-            user_embedding = self.model.encode([user_purpose])
-            
-            # Calculate cosine similarity between user input and all categories
-            similarities = np.dot(user_embedding, self.purpose_embeddings.T)[0]
-            
-            # Find the index of the highest similarity score
-            best_match_idx = np.argmax(similarities)
-            best_match_score = similarities[best_match_idx]
-            
-            logger.debug(f"Semantic match: '{self.purpose_categories[best_match_idx]}' with score {best_match_score}")
-            
-            # Check if the match meets our threshold
-            if best_match_score >= self.similarity_threshold:
-                logger.debug(f"Using semantic match: '{user_purpose}' -> '{self.purpose_categories[best_match_idx]}'")
-                return self.purpose_categories[best_match_idx]
-                
-            # No good match found
-            logger.debug(f"No good match found for: '{user_purpose}'")
-            return None
+            return self._semantic_match_batch([user_purpose])[0]
             
         except Exception as e:
             logger.error(f"Error in purpose matching: {e}")
             return None
+
+    def match_purposes_batch(self, user_purposes: List[str], max_batch_size: int = 8) -> List[Optional[str]]:
+        """
+        Match several purpose statements at once.
+        
+        Keyword matches are resolved directly; the rest share one embedding
+        forward pass per max_batch_size inputs instead of one pass each.
+        """
+        matches: List[Optional[str]] = [self._keyword_match(purpose) for purpose in user_purposes]
+        pending = [i for i, category in enumerate(matches) if category is None]
+        for offset in range(0, len(pending), max_batch_size):
+            chunk = pending[offset:offset + max_batch_size]
+            try:
+                for i, category in zip(chunk, self._semantic_match_batch([user_purposes[i] for i in chunk])):
+                    matches[i] = category
+            except Exception as e:
+                logger.error(f"Error in batch purpose matching: {e}")
+        return matches
     
     def run(self, purpose: str) -> str:
         """
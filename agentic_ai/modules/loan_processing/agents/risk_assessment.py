@@ -3,15 +3,78 @@
 
 import json
 import re
+from typing import Any, Dict, Optional
 from agentic_ai.core.agent.base_agent import BaseAgent
 from agentic_ai.core.utils.parsing import extract_json_from_string
 from agentic_ai.core.utils.formatting import format_indian_commas
 
+# --- Risk Tiers Definition with Final Interest Rate ---
+BASE_INTEREST_RATE = 8.0  # Base interest rate for all categories
+
+RISK_TIERS = [
+    {
+        "name": "Low Risk",
+        "credit_score_range": [750, 900],
+        "composite_score_min": 85,
+        "decision": "approve",
+        "interest_adjustment": 0.0,
+        "final_interest_rate": BASE_INTEREST_RATE + 0.0,
+        "notes": "Eligible for best rate and full approval"
+    },
+    {
+        "name": "Moderate Risk",
+        "credit_score_range": [700, 749],
+        "composite_score_min": 70,
+        "decision": "approve",
+        "interest_adjustment": 1.5,
+        "final_interest_rate": BASE_INTEREST_RATE + 1.5,
+        "notes": "Minor premium on interest rate"
+    },
+    {
+        "name": "Cautionary",
+        "credit_score_range": [650, 699],
+        "composite_score_min": 60,
+        "decision": "approve_with_conditions",
+        "interest_adjustment": 2.5,
+        "final_interest_rate": BASE_INTEREST_RATE + 2.5,
+        "max_loan_amount_pct": 80,
+        "notes": "Approval with reduced amount or shorter tenure"
+    },
+    {
+        "name": "High Risk",
+        "credit_score_range": [600, 649],
+        "composite_score_min": 50,
+        "decision": "escalate",
+        "require_collateral": True,
+        "collateral_type": ["property", "fixed_deposit", "co_applicant"],
+        "notes": "Escalate to human underwriter or offer secured loan"
+    },
+    {
+        "name": "Unacceptable",
+        "credit_score_range": [0, 599],
+        "composite_score_min": 0,
+        "decision": "reject",
+        "require_collateral": False,
+        "notes": "Reject as per lending policy"
+    }
+]
+
+def get_risk_tier(credit_score, composite_score=None) -> dict:
+    """Return a copy of the first tier matching the credit (and composite) score."""
+    for tier in RISK_TIERS:
+        cs_min, cs_max = tier["credit_score_range"]
+        if not cs_min <= credit_score <= cs_max:
+            continue
+        if composite_score is not None and composite_score < tier["composite_score_min"]:
+            continue
+        return dict(tier)
+    return dict(RISK_TIERS[-1])  # Default to Unacceptable
+
 class RiskAssessmentAgent(BaseAgent):
     """Specialized agent for risk assessment."""
 
     def assess_risk(self, query: str) -> str:
-        """Performs comprehensive risk assessment using LLM analysis."""
+        """Parses a 'user_data_json|loan_amount' tool input and runs the risk assessment."""
         try:
             # EMERGENCY OVERRIDE - SIMPLIFIED METHOD
             # Let's create a basic but reliable implementation that doesn't rely on regex
@@ -61,62 +124,6 @@ class RiskAssessmentAgent(BaseAgent):
                         "user_id": "unknown"
                     }
             
-            # --- Risk Tiers Definition ---
-            # --- Risk Tiers Definition with Final Interest Rate ---
- 
-            base_rate = 8.0  # Base interest rate for all categories
- 
-            risk_tiers = [
-
-                {
-
-                    "name": "Low Risk",
-                    "credit_score_range": [750, 900],
-                    "composite_score_min": 85,
-                    "decision": "approve",
-                    "interest_adjustment": 0.0,
-                    "final_interest_rate": base_rate + 0.0,
-                    "notes": "Eligible for best rate and full approval"
-                },
-                {
-                    "name": "Moderate Risk",
-                    "credit_score_range": [700, 749],
-                    "composite_score_min": 70,
-                    "decision": "approve",
-                    "interest_adjustment": 1.5,
-                    "final_interest_rate": base_rate + 1.5,
-                    "notes": "Minor premium on interest rate"
-                },
-                {
-                    "name": "Cautionary",
-                    "credit_score_range": [650, 699],
-                    "composite_score_min": 60,
-                    "decision": "approve_with_conditions",
-                    "interest_adjustment": 2.5,
-                    "final_interest_rate": base_rate + 2.5,
-                    "max_loan_amount_pct": 80,
-                    "notes": "Approval with reduced amount or shorter tenure"
-                },
-
-                {
-                    "name": "High Risk",
-                    "credit_score_range": [600, 649],
-                    "composite_score_min": 50,
-                    "decision": "escalate",
-                    "require_collateral": True,
-                    "collateral_type": ["property", "fixed_deposit", "co_applicant"],
-                    "notes": "Escalate to human underwriter or offer secured loan"
-                },
-                {
-                    "name": "Unacceptable",
-                    "credit_score_range": [0, 599],
-                    "composite_score_min": 0,
-                    "decision": "reject",
-                    "require_collateral": False,
-                    "notes": "Reject as per lending policy"
-                }
-            ]
-            
             # Try to extract loan amount from the query string
             loan_amount = None
             try:
@@ -197,6 +204,15 @@ class RiskAssessmentAgent(BaseAgent):
             except ValueError:
                 return json.dumps({"error": f"Invalid loan amount: {loan_amount_str}"})
 
+            return self.assess_risk_data(user_data, loan_amount, api_credit_score, raw_query=query)
+
+        except Exception as e:
+            return self._fallback_assessment(query, e)
+
+    def assess_risk_data(self, user_data: Dict[str, Any], loan_amount: float,
+                         api_credit_score: Optional[int] = None, raw_query: str = "") -> str:
+        """Performs comprehensive risk assessment using LLM analysis on already-parsed user data."""
+        try:
             # --- Patch: Ensure credit_score is set to api_credit_score if present ---
             if isinstance(user_data, dict):
                 # Use the extracted api_credit_score from regex if it exists and not in user_data
@@ -235,9 +251,9 @@ class RiskAssessmentAgent(BaseAgent):
                 if credit_score == 0:  # Only update if not already set
                     credit_score = actual_user_data_score
                     
-            # Search directly in the raw query string (most aggressive approach)
+            # Search directly in the raw query string, if there is one (most aggressive approach)
             try:
-                all_credit_scores = re.findall(r'(?:api_credit_score|credit_score)[":]?\s*(\d+)', query)
+                all_credit_scores = re.findall(r'(?:api_credit_score|credit_score)[":]?\s*(\d+)', raw_query)
                 for i, score_str in enumerate(all_credit_scores):
                     try:
                         score = int(score_str)
@@ -250,7 +266,7 @@ class RiskAssessmentAgent(BaseAgent):
                 # Try a simple digit extraction if regex fails
                 try:
                     import re  # Re-import to ensure availability
-                    digits = re.findall(r'\d+', query)
+                    digits = re.findall(r'\d+', raw_query)
                     for digit in digits:
                         if len(digit) == 3:  # Credit scores are typically 3 digits
                             score = int(digit)
@@ -296,7 +312,36 @@ class RiskAssessmentAgent(BaseAgent):
             print(f"💰 Monthly Income: {format_indian_commas(monthly_salary)} | 💳 Credit Score: {credit_score} | 📊 Existing EMI: {format_indian_commas(existing_emi)}")
             print(f"💭 Thought: Analyzing financial capacity for a loan request of {format_indian_commas(loan_amount)}...")
 
-            prompt = f"""
+            # --- Risk Category Calculation ---
+            tier_credit_score = credit_score
+            if tier_credit_score == 0 and extracted_credit_scores:
+                valid_scores = [score for _, score in extracted_credit_scores if score > 0]
+                if valid_scores:
+                    tier_credit_score = max(valid_scores)
+            risk_tier = get_risk_tier(tier_credit_score, composite_score)
+
+            # Calculate and print debt-to-income ratio as part of thought process
+            dti_ratio = None
+            if monthly_salary > 0:
+                new_emi_estimate = loan_amount / 36  # Simple estimate for a 3-year loan
+                total_emi = existing_emi + new_emi_estimate
+                dti_ratio = (total_emi / monthly_salary) * 100
+                print(f"💭 Debt-to-Income Analysis: Current DTI: {(existing_emi/monthly_salary)*100:.1f}%, Projected DTI: {dti_ratio:.1f}%")
+                if dti_ratio > 50:
+                    print("💭 Warning: Projected DTI exceeds 50% safe threshold")
+                elif dti_ratio > 30:
+                    print("💭 Note: Projected DTI exceeds 30% recommended threshold")
+
+            # Clear low-risk applicants get a deterministic summary; the LLM
+            # analysis is only needed when there is something to weigh up
+            if risk_tier["name"] == "Low Risk" and dti_ratio is not None and dti_ratio <= 30:
+                llm_analysis = (
+                    f"Low risk: credit score {credit_score}, projected DTI {dti_ratio:.1f}% "
+                    f"for a loan of {format_indian_commas(loan_amount)}. Decision: Approve."
+                )
+                print(f"💭 Risk Analysis: {llm_analysis}")
+            else:
+                prompt = f"""
 Analyze the loan risk for the following applicant in 3-4 concise lines.
 Applicant Details:
 - Monthly Salary: {format_indian_commas(monthly_salary)}
@@ -308,69 +353,30 @@ Based on this information, provide a risk assessment, overall decision (Approve/
 IMPORTANT: Preserve the exact credit score of {credit_score} in your assessment. Do not change or override this value.
 """
             
-            llm_analysis = self.llm._call(prompt)
+                llm_analysis = self.llm._call(prompt)
             
-            # CRITICAL FIX: Remove any "Action Input:" from the LLM's response
-            # This prevents the LLM from generating a new Action Input inside risk assessment
-            if "Action Input:" in llm_analysis:
-                llm_analysis = llm_analysis.split("Action Input:")[0].strip()
+                # CRITICAL FIX: Remove any "Action Input:" from the LLM's response
+                # This prevents the LLM from generating a new Action Input inside risk assessment
+                if "Action Input:" in llm_analysis:
+                    llm_analysis = llm_analysis.split("Action Input:")[0].strip()
                 
-            # NEW FIX: Replace any incorrect credit score the LLM might have generated in its response
-            # This handles cases where the LLM tries to be helpful and include a credit score in its analysis
-            # but it doesn't match our actual credit score
-            if credit_score > 0:
-                try:
-                    # Replace phrases like "credit score of 0" or "credit score: 0" with our actual score
-                    llm_analysis = re.sub(r'credit score\s*(?:of|:)\s*\d+', f'credit score: {credit_score}', 
-                                        llm_analysis, flags=re.IGNORECASE)
-                    # Also replace standalone references like "with a 600 credit score" 
-                    llm_analysis = re.sub(r'(\s|^)(\d{3})(\s+credit score)', f'\\1{credit_score}\\3', 
-                                        llm_analysis, flags=re.IGNORECASE)
-                except Exception as e:
-                    # Just add the credit score at the beginning if regex fails
-                    llm_analysis = f"[Credit Score: {credit_score}] " + llm_analysis
-            
-            # Print the detailed thought process
-            print(f"💭 Risk Analysis: {llm_analysis}")
-            
-            # Calculate and print debt-to-income ratio as part of thought process
-            if monthly_salary > 0:
-                new_emi_estimate = loan_amount / 36  # Simple estimate for a 3-year loan
-                total_emi = existing_emi + new_emi_estimate
-                dti_ratio = (total_emi / monthly_salary) * 100
-                print(f"💭 Debt-to-Income Analysis: Current DTI: {(existing_emi/monthly_salary)*100:.1f}%, Projected DTI: {dti_ratio:.1f}%")
-                if dti_ratio > 50:
-                    print("💭 Warning: Projected DTI exceeds 50% safe threshold")
-                elif dti_ratio > 30:
-                    print("💭 Note: Projected DTI exceeds 30% recommended threshold")
+                # NEW FIX: Replace any incorrect credit score the LLM might have generated in its response
+                # This handles cases where the LLM tries to be helpful and include a credit score in its analysis
+                # but it doesn't match our actual credit score
+                if credit_score > 0:
+                    try:
+                        # Replace phrases like "credit score of 0" or "credit score: 0" with our actual score
+                        llm_analysis = re.sub(r'credit score\s*(?:of|:)\s*\d+', f'credit score: {credit_score}', 
+                                            llm_analysis, flags=re.IGNORECASE)
+                        # Also replace standalone references like "with a 600 credit score" 
+                        llm_analysis = re.sub(r'(\s|^)(\d{3})(\s+credit score)', f'\\1{credit_score}\\3', 
+                                            llm_analysis, flags=re.IGNORECASE)
+                    except Exception as e:
+                        # Just add the credit score at the beginning if regex fails
+                        llm_analysis = f"[Credit Score: {credit_score}] " + llm_analysis
             
-            # --- Risk Category Calculation ---
-            def get_risk_category(credit_score, composite_score=None):
-                # Validate credit score is non-zero
-                if credit_score == 0 and extracted_credit_scores:
-                    valid_scores = [score for _, score in extracted_credit_scores if score > 0]
-                    if valid_scores:
-                        credit_score = max(valid_scores)
-                
-                # Find matching tier
-                for tier in risk_tiers:
-                    cs_min, cs_max = tier["credit_score_range"]
-                    comp_min = tier["composite_score_min"]
-                    
-                    # Check credit score range
-                    credit_score_match = cs_min <= credit_score <= cs_max
-                    
-                    # Check composite score if available
-                    comp_score_match = True
-                    if composite_score is not None:
-                        comp_score_match = composite_score >= comp_min
-                    
-                    if credit_score_match and comp_score_match:
-                        return tier
-                        
-                return risk_tiers[-1]  # Default to Unacceptable
-                
-            risk_tier = get_risk_category(credit_score, composite_score)
+                # Print the detailed thought process
+                print(f"💭 Risk Analysis: {llm_analysis}")
 
             print("=" * 50 + "\n")
             
@@ -389,47 +395,55 @@ IMPORTANT: Preserve the exact credit score of {credit_score} in your assessment.
             return json.dumps(response, indent=2)
             
         except Exception as e:
-            # ULTRA FALLBACK MODE - This will always work even if everything else fails
-            try:
-                # Extract any number that could be a credit score
-                credit_score = 0
-                
-                if "api_credit_score" in query:
-                    for part in query.split():
-                        if part.isdigit() and 300 <= int(part) <= 900:
-                            credit_score = int(part)
-                            break
-                
-                risk_tier = {
-                    "name": "Emergency Fallback",
-                    "credit_score_range": [0, 900],
-                    "composite_score_min": 0, 
-                    "decision": "escalate",
-                    "notes": "Error occurred during assessment; manual review required"
-                }
-                
-                if credit_score >= 750:
-                    risk_tier["decision"] = "approve"
-                elif credit_score >= 600:
-                    risk_tier["decision"] = "approve_with_conditions"
-                
-                response = {
-                    "loan_amount_requested": 500000,
-                    "user_data_summary": {"credit_score": credit_score},
-                    "llm_risk_assessment": "Error occurred during assessment. This is an emergency fallback response.",
-                    "risk_category": risk_tier,
-                    "status": "emergency_fallback_assessment",
-                    "error": str(e)
-                }
-                
-                return json.dumps(response, indent=2)
-            except:
-                # Absolute last resort
-                return json.dumps({
-                    "error": f"Risk assessment critical failure: {str(e)}",
-                    "status": "critical_error",
-                    "recommendation": "Please contact IT support."
-                })
+            return self._fallback_assessment(raw_query, e, user_data)
+
+    def _fallback_assessment(self, query: str, e: Exception, user_data: Optional[Dict[str, Any]] = None) -> str:
+        """Emergency response used when the assessment itself fails."""
+        # ULTRA FALLBACK MODE - This will always work even if everything else fails
+        try:
+            # Extract any number that could be a credit score
+            credit_score = 0
+            
+            if "api_credit_score" in query:
+                for part in query.split():
+                    if part.isdigit() and 300 <= int(part) <= 900:
+                        credit_score = int(part)
+                        break
+
+            # Structured callers have no query string; read the score from the data instead
+            if credit_score == 0 and isinstance(user_data, dict):
+                credit_score = int(user_data.get('api_credit_score') or user_data.get('credit_score') or 0)
+            
+            risk_tier = {
+                "name": "Emergency Fallback",
+                "credit_score_range": [0, 900],
+                "composite_score_min": 0, 
+                "decision": "escalate",
+                "notes": "Error occurred during assessment; manual review required"
+            }
+            
+            if credit_score >= 750:
+                risk_tier["decision"] = "approve"
+            elif credit_score >= 600:
+                risk_tier["decision"] = "approve_with_conditions"
+            
+            response = {
+                "loan_amount_requested": 500000,
+                "user_data_summary": {"credit_score": credit_score},
+                "llm_risk_assessment": "Error occurred during assessment. This is an emergency fallback response.",
+                "risk_category": risk_tier,
+                "status": "emergency_fallback_assessment",
+                "error": str(e)
+            }
+            
+            return json.dumps(response, indent=2)
+        except:
+            # Absolute last resort
+            return json.dumps({
+                "error": f"Risk assessment critical failure: {str(e)}",
+                "status": "critical_error",
+                "recommendation": "Please contact IT support."
+            })
 
     def run(self, query: str) -> str:
         """Runs the agent's specific task."""
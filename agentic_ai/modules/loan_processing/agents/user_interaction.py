@@ -2,17 +2,77 @@
 import os
 import re
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+try:
+    import ahocorasick
+except ImportError:  # fall back to plain substring scans
+    ahocorasick = None
 from agentic_ai.core.agent.base_agent import BaseAgent
 from agentic_ai.core.config.constants import AVAILABLE_CITIES
+from agentic_ai.core.config.reliability import LLM_CACHE_ENABLED, LLM_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE
+from agentic_ai.core.llm.response_cache import ResponseCache
+from agentic_ai.core.llm.semantic_cache import SemanticCache
 from agentic_ai.core.utils.fuzzy_matcher import CityMatcher
 from agentic_ai.core.utils.formatting import format_indian_currency_without_decimal, format_indian_commas
+from agentic_ai.core.utils.parsing import collect_json_from_stream, extract_json_from_string
  
+# Static instructions for the LLM compliance check, kept byte-identical across calls
+# so the provider can reuse its cached prompt prefix; only the purpose varies
+_COMPLIANCE_RULES = """You are a bank compliance officer. Decide whether the loan purpose in the user message is legal, ethical and compliant with banking regulations.
+Reject (NO) on ANY suspicion of: illegal activity (drugs, weapons, terrorism, fraud, hacking, theft), prohibited uses (gambling, adult content, cryptocurrency), money laundering, or other regulatory violations.
+Accept (YES) legitimate personal or family needs (e.g. "personal expenses", "life events") and vague but unsuspicious purposes like "I need money".
+"""
+_COMPLIANCE_SYSTEM_PROMPT = _COMPLIANCE_RULES + """Respond with a single JSON object only:
+{"is_permitted": "YES or NO", "reason": "Brief explanation of your decision"}"""
+_COMPLIANCE_BATCH_SYSTEM_PROMPT = _COMPLIANCE_RULES.replace("the loan purpose", "each numbered loan purpose") + """Judge each purpose independently. Respond with a single JSON object only, one verdict per purpose in the same order:
+{"verdicts": [{"is_permitted": "YES or NO", "reason": "Brief explanation of your decision"}, ...]}"""
+
+# Heuristic patterns for the static purpose check, combined so the input is scanned once;
+# the matching group name selects the rejection reason
+_SUSPICIOUS_PURPOSE_RE = re.compile(
+    r'\b(?:(?P<illegal>illegal)|(?P<black_market>black\s*market)|(?P<money_laundering>money\s*laundering)'
+    r'|(?P<terrorist>terrorist)|(?P<fraud>fraud)|(?P<scam>scam))\b'
+)
+_SUSPICIOUS_PURPOSE_REASONS = {
+    "illegal": "potentially illegal activities",
+    "black_market": "black market activities",
+    "money_laundering": "money laundering",
+    "terrorist": "terrorism-related activities",
+    "fraud": "fraudulent activities",
+    "scam": "scam-related activities",
+}
+
+# run() routes a query by the keywords it contains, in priority order; every keyword
+# group of a route must have a keyword occurring in the query (as a substring, so
+# "purposes" and "accepted" route like "purpose" and "accept")
+_IDENTITY_QUERY_KEYWORDS = ("pan", "aadhaar")
+_QUERY_ROUTES = (
+    ((("purpose",),), "_get_loan_purpose", "purpose"),
+    ((("amount",),), "_get_loan_amount", "amount"),
+    ((("city",),), "_get_city", "city"),
+    ((("salary",), ("update",)), "_confirm_salary_update", "salary_update_confirmation"),
+    ((("path", "document", "pdf"),), "_get_pdf_path", "document_path"),
+    ((("accept", "decline", "agreement"),), "_get_agreement_acceptance", "agreement_response"),
+)
+_QUERY_HANDLERS = {result_key: handler_name for _, handler_name, result_key in _QUERY_ROUTES}
+
 class UserInteractionAgent(BaseAgent):
     """Specialized agent for user interaction."""
- 
-    def __init__(self, input_provider=None):
+
+    # Background worker for speculative work that overlaps with the blocking input prompt
+    _bg = ThreadPoolExecutor(max_workers=2, thread_name_prefix="user-io")
+    # Compliance verdicts from the LLM, shared across applicants: exact (normalized) purposes
+    # first, then reworded ones by embedding similarity (denials only)
+    _compliance_cache = ResponseCache(maxsize=LLM_CACHE_SIZE)
+    _compliance_semantic_cache = None
+    # Aho-Corasick automaton over the personal and restricted purpose phrases, built on first use
+    _purpose_automaton = None
+ 
+    def __init__(self, input_provider=None, data_agent=None):
         super().__init__()
         self.input_provider = input_provider or input  # Default to built-in input()
+        self.data_agent = data_agent  # Optional DataQueryAgent used to prefetch identity lookups
         self.is_ui_mode = input_provider is not None and input_provider != input  # Detect UI mode
         self.reset_state()
         # Initialize the city matcher for fuzzy city name matching
@@ -68,6 +128,26 @@ class UserInteractionAgent(BaseAgent):
         self._asked_salary_update = False
         self._asked_pdf_path = False
         self.initial_details = {}
+        self._speculations: Dict[str, Future] = {}
+
+    def speculate(self, key: str, fn: Callable[..., Any], *args) -> Future:
+        """Starts fn(*args) in the background so it runs while the user is typing."""
+        future = self._speculations.get(key)
+        if future is None:
+            future = self._bg.submit(fn, *args)
+            self._speculations[key] = future
+        return future
+
+    def take_speculation(self, key: str) -> Optional[Any]:
+        """Joins and returns a speculative result, or None if it was never started or failed."""
+        future = self._speculations.pop(key, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"⚠️ Speculative task '{key}' failed: {e}")
+            return None
 
     def _map_purpose_to_standard_category(self, user_purpose: str) -> str:
         """
@@ -422,66 +502,167 @@ class UserInteractionAgent(BaseAgent):
         if not hasattr(self, 'llm') or self.llm is None:
             print("[DEBUG] LLM not initialized, falling back to static validation")
             return self.validate_static_restrictions(purpose)
-           
-        # Craft a prompt for the LLM to evaluate the purpose
-        prompt = f"""
-You are a bank compliance officer responsible for evaluating loan applications.
-Your task is to determine if the following loan purpose is legal, ethical, and compliant with banking regulations:
- 
-LOAN PURPOSE: "{purpose}"
- 
-EVALUATION CRITERIA:
-1. Illegal activities: drugs, weapons, terrorism, fraud, hacking, theft, etc.
-2. Prohibited loan uses: gambling, adult content, cryptocurrency
-3. Money laundering risk: suspicious activities that could hide illegal sources of money
-4. Regulatory compliance: any activity that might violate banking or financial regulations
- 
-IMPORTANT NOTES:
-- Personal loan purposes ARE PERMITTED (examples: "personal expenses", "personal needs", "life events", "family needs")
-- General purposes related to legitimate personal or family life needs ARE PERMITTED
-- Vague purposes like "I need money" are acceptable but should be marked with a note for follow-up
- 
-INSTRUCTIONS:
-- If there is ANY suspicion of illegal or prohibited activity, mark as "NO"
-- If the purpose is legitimate, legal, or for personal/family needs, mark as "YES"
-- Respond with YES if the purpose is legal, even if it's somewhat vague but not suspicious
- 
-Respond in the following format only:
-IS_PERMITTED: [YES/NO]
-REASON: [Brief explanation of your decision]
-"""
+
+        # Answer repeated purposes (or rewordings of denied ones) without another compliance LLM call
+        cache_key = None
+        query_vec = None
+        if LLM_CACHE_ENABLED:
+            cache_key = ResponseCache.make_key(" ".join(purpose.lower().split()))
+            cached = self._compliance_cache.get(cache_key)
+            if cached is not None:
+                print(f"[DEBUG] Compliance verdict for '{purpose}' served from cache")
+                return cached
+            try:
+                semantic_cache = self._get_compliance_semantic_cache()
+                if semantic_cache:
+                    query_vec = semantic_cache.embed_query(purpose)
+                    cached = semantic_cache.get(query_vec)
+                    if cached is not None:
+                        print(f"[DEBUG] Compliance verdict for '{purpose}' served from semantic cache")
+                        self._compliance_cache.put(cache_key, cached)
+                        return cached
+            except Exception as e:
+                print(f"[DEBUG] Semantic cache lookup failed: {str(e)}")
+                query_vec = None
+
+        prompt = f'LOAN PURPOSE: "{purpose}"'
         try:
             print(f"[DEBUG] Evaluating purpose with LLM: '{purpose}'")
-            # Call the LLM to evaluate
-            response = self.llm._call(prompt)
+            # Stream the verdict and stop reading as soon as the JSON object closes
+            stream = self.llm.stream_response(prompt, system_prompt=_COMPLIANCE_SYSTEM_PROMPT, temperature=0,
+                                              response_format={"type": "json_object"})
+            try:
+                response = collect_json_from_stream(stream)
+            finally:
+                stream.close()
             print(f"[DEBUG] LLM response: {response}")
            
-            # Parse the response
-            is_permitted = False
-            if "IS_PERMITTED: YES" in response and "IS_PERMITTED: NO" not in response:
-                is_permitted = True
-           
-            # Extract reason from response
-            reason = ""
-            if "REASON:" in response:
-                reason = response.split("REASON:")[1].strip()
-                # Clean up any markdown backticks
-                reason = reason.replace("```", "").strip()
+            # Parse the response; a stream that yielded no verdict gets one non-streaming attempt
+            verdict_json = extract_json_from_string(response) or {}
+            if "is_permitted" not in verdict_json:
+                response = self.llm._call(prompt, system_prompt=_COMPLIANCE_SYSTEM_PROMPT, temperature=0,
+                                          response_format={"type": "json_object"})
+                print(f"[DEBUG] LLM response (non-streaming): {response}")
+                verdict_json = extract_json_from_string(response) or {}
+            # Without a well-formed verdict the static rules decide
+            if "is_permitted" not in verdict_json:
+                print("[DEBUG] No usable compliance verdict from LLM, falling back to static validation")
+                return self.validate_static_restrictions(purpose)
+            is_permitted = str(verdict_json.get("is_permitted", "")).strip().upper() == "YES"
+            reason = str(verdict_json.get("reason", "")).strip()
            
             if is_permitted:
                 print(f"[DEBUG] LLM approved purpose: '{purpose}'")
-                return True, "Purpose accepted by compliance check"
+                verdict = (True, "Purpose accepted by compliance check")
             else:
                 if not reason:
                     reason = "This purpose may violate our lending policy or regulations"
                 print(f"[DEBUG] LLM rejected purpose: '{purpose}', reason: {reason}")
-                return False, f"❌ LOAN REQUEST DENIED: {reason}"
+                verdict = (False, f"❌ LOAN REQUEST DENIED: {reason}")
+
+            if cache_key is not None:
+                self._compliance_cache.put(cache_key, verdict)
+                # A reworded purpose only reuses a denial; approvals need an exact match
+                if query_vec is not None and not is_permitted:
+                    self._compliance_semantic_cache.put(query_vec, verdict)
+            return verdict
                
         except Exception as e:
             print(f"[DEBUG] Error in LLM evaluation: {str(e)}")
             # Fallback to static validation if LLM fails
             return self.validate_static_restrictions(purpose)
+
+    def evaluate_purposes_batch(self, purposes: list) -> list:
+        """
+        Evaluates several loan purposes with one compliance LLM call instead of one call each.
+
+        Args:
+            purposes: The loan purposes to evaluate
+
+        Returns:
+            list: (is_legal, message) tuples in input order, as from evaluate_purpose_with_llm
+        """
+        results = [None] * len(purposes)
+        pending = []
+        for i, purpose in enumerate(purposes):
+            cached = None
+            if LLM_CACHE_ENABLED and purpose:
+                cached = self._compliance_cache.get(ResponseCache.make_key(" ".join(purpose.lower().split())))
+            if cached is not None:
+                results[i] = cached
+            elif not purpose or purpose.lower() in ["unknown", "need", "want", "anything"] or self.llm is None:
+                results[i] = self.evaluate_purpose_with_llm(purpose)
+            else:
+                pending.append(i)
+
+        if len(pending) == 1:
+            results[pending[0]] = self.evaluate_purpose_with_llm(purposes[pending[0]])
+        elif pending:
+            prompt = "\n".join(f'{n}. LOAN PURPOSE: "{purposes[i]}"' for n, i in enumerate(pending, 1))
+            try:
+                print(f"[DEBUG] Evaluating {len(pending)} purposes with one LLM call")
+                response = self.llm._call(prompt, system_prompt=_COMPLIANCE_BATCH_SYSTEM_PROMPT,
+                                          response_format={"type": "json_object"})
+                verdicts = extract_json_from_string(response).get("verdicts")
+                if not isinstance(verdicts, list) or len(verdicts) != len(pending):
+                    raise ValueError(f"expected {len(pending)} verdicts, got: {response[:200]}")
+                if not all(isinstance(v, dict) and "is_permitted" in v for v in verdicts):
+                    raise ValueError(f"malformed verdicts: {response[:200]}")
+                for i, verdict_json in zip(pending, verdicts):
+                    is_permitted = str(verdict_json.get("is_permitted", "")).strip().upper() == "YES"
+                    reason = str(verdict_json.get("reason", "")).strip() or "This purpose may violate our lending policy or regulations"
+                    verdict = (True, "Purpose accepted by compliance check") if is_permitted else (False, f"❌ LOAN REQUEST DENIED: {reason}")
+                    if LLM_CACHE_ENABLED:
+                        self._compliance_cache.put(ResponseCache.make_key(" ".join(purposes[i].lower().split())), verdict)
+                    results[i] = verdict
+            except Exception as e:
+                print(f"[DEBUG] Batch compliance check failed, evaluating individually: {str(e)}")
+                for i in pending:
+                    results[i] = self.evaluate_purpose_with_llm(purposes[i])
+        return results
+
+    @classmethod
+    def _get_compliance_semantic_cache(cls) -> Optional[SemanticCache]:
+        """Builds the semantic tier on first use from the shared sentence model; None if unavailable."""
+        if cls._compliance_semantic_cache is None:
+            from agentic_ai.core.utils.embeddings import get_sentence_transformer_model
+            model = get_sentence_transformer_model()
+            if model is None:
+                return None
+            cls._compliance_semantic_cache = SemanticCache(
+                model.encode, threshold=SEMANTIC_CACHE_THRESHOLD, maxsize=SEMANTIC_CACHE_SIZE
+            )
+        return cls._compliance_semantic_cache
    
+    def _scan_purpose_phrases(self, purpose_lower: str) -> tuple:
+        """Finds (personal phrase, first restricted phrase) in the purpose; either may be None.
+
+        Uses a single Aho-Corasick pass over all ~90 phrases when pyahocorasick is installed.
+        """
+        if ahocorasick is None:
+            personal = next((p for p in self._personal_purpose_examples if p in purpose_lower), None)
+            if personal:
+                return personal, None
+            return None, next((r for r in self._restricted_purposes if r in purpose_lower), None)
+
+        if UserInteractionAgent._purpose_automaton is None:
+            automaton = ahocorasick.Automaton()
+            for phrase in self._personal_purpose_examples:
+                automaton.add_word(phrase, (-1, phrase))
+            for index, phrase in enumerate(self._restricted_purposes):
+                if phrase not in automaton:
+                    automaton.add_word(phrase, (index, phrase))
+            automaton.make_automaton()
+            UserInteractionAgent._purpose_automaton = automaton
+
+        first_restricted = None
+        for _, (index, phrase) in UserInteractionAgent._purpose_automaton.iter(purpose_lower):
+            if index < 0:
+                return phrase, None
+            if first_restricted is None or index < first_restricted[0]:
+                first_restricted = (index, phrase)
+        return None, first_restricted[1] if first_restricted else None
+
     def validate_static_restrictions(self, purpose: str) -> tuple:
         """
         Fallback validation using static rules when LLM is unavailable.
@@ -495,35 +676,24 @@ REASON: [Brief explanation of your decision]
         # Convert to lowercase for case-insensitive matching
         purpose_lower = purpose.lower()
        
-        # First check if this is an explicitly personal purpose
-        for personal_purpose in self._personal_purpose_examples:
-            if personal_purpose in purpose_lower:
-                print(f"[DEBUG] Matched personal purpose: '{personal_purpose}' in '{purpose_lower}'")
-                return True, "Personal purpose accepted"
-       
-        # Check against restricted purposes
-        for restricted in self._restricted_purposes:
-            if restricted in purpose_lower:
-                return False, f"❌ LOAN REQUEST DENIED: We cannot approve loans for {restricted}-related activities as this violates our lending policy and may be illegal."
+        # Personal purposes take precedence; otherwise the first restricted phrase (in list order) is reported
+        personal_purpose, restricted = self._scan_purpose_phrases(purpose_lower)
+        if personal_purpose:
+            print(f"[DEBUG] Matched personal purpose: '{personal_purpose}' in '{purpose_lower}'")
+            return True, "Personal purpose accepted"
+        if restricted:
+            return False, f"❌ LOAN REQUEST DENIED: We cannot approve loans for {restricted}-related activities as this violates our lending policy and may be illegal."
        
         # Check if it contains the word "personal" which generally indicates a personal loan
         if "personal" in purpose_lower:
             print(f"[DEBUG] Contains 'personal' keyword: '{purpose_lower}'")
             return True, "Personal purpose accepted"
        
-        # Additional heuristic checks for potentially suspicious purposes
-        suspicious_patterns = [
-            (r'\billegal\b', "potentially illegal activities"),
-            (r'\bblack\s*market\b', "black market activities"),
-            (r'\bmoney\s*laundering\b', "money laundering"),
-            (r'\bterrorist\b', "terrorism-related activities"),
-            (r'\bfraud\b', "fraudulent activities"),
-            (r'\bscam\b', "scam-related activities")
-        ]
-       
-        for pattern, reason in suspicious_patterns:
-            if re.search(pattern, purpose_lower):
-                return False, f"❌ LOAN REQUEST DENIED: We cannot approve loans for {reason} as this violates our lending policy and may be illegal."
+        # Additional heuristic checks for potentially suspicious purposes (one scan for all patterns)
+        suspicious_match = _SUSPICIOUS_PURPOSE_RE.search(purpose_lower)
+        if suspicious_match:
+            reason = _SUSPICIOUS_PURPOSE_REASONS[suspicious_match.lastgroup]
+            return False, f"❌ LOAN REQUEST DENIED: We cannot approve loans for {reason} as this violates our lending policy and may be illegal."
        
         # If we've reached here and it's not explicitly rejected, assume it's valid
         return True, "Purpose accepted"
@@ -555,13 +725,11 @@ REASON: [Brief explanation of your decision]
            
         return True, "Purpose accepted"
  
-    def get_user_input(self, prompt):
-        return self.input_provider(prompt)
- 
     def handle_user_input(self, question: str) -> str:
         """Handles user interaction by prompting for actual input, enforcing Aadhaar/PAN/consent flow and color output for consent."""
         try:
             print(f"[DEBUG] UserInteractionAgent received question: {question}")
+            question_lower = question.lower()  # every routing check below reads the lowercased question
             from agentic_ai.core.utils.validators import is_pan, is_aadhaar
  
             # ANSI color codes - only use in CLI mode
@@ -577,11 +745,11 @@ REASON: [Brief explanation of your decision]
  
             # Only run the identity/consent flow if not already completed and only at the correct stage
             # Aadhaar/PAN/consent strict flow should only be triggered after loan purpose is confirmed
-            is_required_loan_purpose = "purpose" in question.lower() or "what is the loan for" in question.lower()
-            is_required_loan_amount = "amount" in question.lower() or "how much" in question.lower()
-            is_asking_for_aadhaar = ("aadhaar" in question.lower()) and not ("pan" in question.lower())
-            is_asking_for_pan = ("pan" in question.lower()) and not ("aadhaar" in question.lower())
-            is_asking_for_both = ("pan" in question.lower() and "aadhaar" in question.lower())
+            is_required_loan_purpose = "purpose" in question_lower or "what is the loan for" in question_lower
+            is_required_loan_amount = "amount" in question_lower or "how much" in question_lower
+            is_asking_for_aadhaar = ("aadhaar" in question_lower) and not ("pan" in question_lower)
+            is_asking_for_pan = ("pan" in question_lower) and not ("aadhaar" in question_lower)
+            is_asking_for_both = ("pan" in question_lower and "aadhaar" in question_lower)
  
             # Only trigger Aadhaar/PAN/consent flow if the question is specifically for Aadhaar or PAN
             if (is_asking_for_aadhaar or is_asking_for_both) and not self._aadhaar_collected:
@@ -636,21 +804,30 @@ REASON: [Brief explanation of your decision]
                     if value:
                         print(f"{GREEN}✅ Consent received for Aadhaar processing.{RESET}")
                         self._aadhaar_consent = True
+                        # Fetch Aadhaar details while the user moves on to the PAN prompt
+                        if self.data_agent:
+                            self.data_agent.prefetch(aadhaar=self._aadhaar_number)
                     else:
                         print(f"{RED}Consent not given. The process will be terminated.{RESET}")
                         return "USER_EXIT"
  
  
             if (is_asking_for_pan or is_asking_for_both) and self._aadhaar_collected and self._aadhaar_consent and not self._pan_collected:
+                def lookup_expected_pan(aadhaar):
+                    from agentic_ai.modules.loan_processing.services.loan_data_service import LoanDataService
+                    return LoanDataService().get_pan_by_aadhaar(aadhaar)
+
+                # Resolve the Aadhaar-linked PAN while the user is still typing theirs
+                self.speculate("expected_pan", lookup_expected_pan, self._aadhaar_number)
+
                 def validate_pan(user_input):
                     if is_pan(user_input):
                         # SECURITY CHECK: Ensure PAN matches the one linked to the Aadhaar
                         try:
-                            from agentic_ai.modules.loan_processing.services.loan_data_service import LoanDataService
-                            data_service = LoanDataService()
-                            user_row = data_service.df[data_service.df['aadhaar_number'] == self._aadhaar_number]
-                            if not user_row.empty:
-                                expected_pan = user_row.iloc[0]['pan_number']
+                            expected_pan = self.take_speculation("expected_pan")
+                            if expected_pan is None:
+                                expected_pan = lookup_expected_pan(self._aadhaar_number)
+                            if expected_pan:
                                 if expected_pan.upper().strip() != user_input.upper().strip():
                                     return False, "SECURITY ALERT: The PAN you entered does not match the PAN linked to your Aadhaar. Please check and enter the correct PAN. The process will be terminated for your security."
                             return True, user_input
@@ -706,6 +883,9 @@ REASON: [Brief explanation of your decision]
                     if value:
                         print(f"{GREEN}✅ Consent received for PAN processing.{RESET}")
                         self._pan_consent = True
+                        # Start the credit score lookup before the workflow gets round to DataQuery
+                        if self.data_agent:
+                            self.data_agent.prefetch(pan=self._pan_number)
                         # CRITICAL FIX: After final consent, immediately return the collected PAN
                         if hasattr(self, '_pan_number') and self._pan_number:
                             return self._pan_number
@@ -726,14 +906,12 @@ REASON: [Brief explanation of your decision]
  
             # After identity/consent, handle further questions as before
             # ...existing code for other questions (purpose, amount, city, etc.)...
-            is_required_city = "city" in question.lower() and "your city" in question.lower()
-            is_required_loan_purpose = "purpose" in question.lower() or "what is the loan for" in question.lower()
-            is_required_loan_amount = "amount" in question.lower() or "how much" in question.lower()
-            is_salary_update_query = "update" in question.lower() and "salary" in question.lower()
-            is_pdf_path_query = "pdf" in question.lower() or "salary slip" in question.lower() or "path" in question.lower()
+            is_required_city = "city" in question_lower and "your city" in question_lower
+            is_salary_update_query = "update" in question_lower and "salary" in question_lower
+            is_pdf_path_query = "pdf" in question_lower or "salary slip" in question_lower or "path" in question_lower
  
             # Prevent repeated PAN/Aadhaar prompts: if the question is for PAN/Aadhaar and already collected, just return the PAN (or Aadhaar) already provided
-            if ("pan" in question.lower() or "aadhaar" in question.lower()) and self._aadhaar_collected and self._aadhaar_consent and self._pan_collected and self._pan_consent:
+            if ("pan" in question_lower or "aadhaar" in question_lower) and self._aadhaar_collected and self._aadhaar_consent and self._pan_collected and self._pan_consent:
                 # Prefer PAN if available, else Aadhaar
                 if hasattr(self, '_pan_number') and self._pan_number:
                     return self._pan_number
@@ -782,112 +960,72 @@ REASON: [Brief explanation of your decision]
                 self._asked_pdf_path = True
  
             # Ask city with fuzzy validation
-            if is_required_city:
-                city_list_str = ", ".join(AVAILABLE_CITIES)
-               
-                def validate_city(user_input):
-                    if not user_input:
-                        return False, "City is required."
-                    matched_city, score = self.city_matcher.get_closest_match(user_input)
-                    if matched_city:
-                        if score == 100:
-                            print(f"{GREEN}✓ Recognized city: {matched_city}{RESET}")
-                        else:
-                            print(f"{GREEN}✓ Recognized '{user_input}' as '{matched_city}' (match score: {score}%){RESET}")
-                        return True, matched_city
-                    elif score > 50:
-                        return False, f"Did you mean one of our supported cities? Your entry '{user_input}' was not recognized. Available options: {city_list_str}"
+            city_list_str = ", ".join(AVAILABLE_CITIES)
+           
+            def validate_city(user_input):
+                if not user_input:
+                    return False, "City is required."
+                matched_city, score = self.city_matcher.get_closest_match(user_input)
+                if matched_city:
+                    if score == 100:
+                        print(f"{GREEN}✓ Recognized city: {matched_city}{RESET}")
                     else:
-                        return False, f"Invalid city. Please select from: {city_list_str}"
-               
-                success, value, message = self._validate_input_with_retry(
-                    f"{YELLOW}🤔 {question} (Available options: {city_list_str}){RESET}",
-                    validate_city,
-                    f"{RED}⚠️ Invalid city selection.{RESET}"
-                )
-               
-                if not success:
-                    if value == "USER_EXIT":
-                        print(f"{RED}You have chosen to exit. Exiting the process.{RESET}")
-                        return "USER_EXIT"
-                    elif self.is_ui_mode:
-                        return f"ERROR: {message}"
+                        print(f"{GREEN}✓ Recognized '{user_input}' as '{matched_city}' (match score: {score}%){RESET}")
+                    return True, matched_city
+                elif score > 50:
+                    return False, f"Did you mean one of our supported cities? Your entry '{user_input}' was not recognized. Available options: {city_list_str}"
                 else:
-                    return value
- 
-            elif is_required_loan_purpose:
-                def validate_purpose(user_input):
-                    if not user_input or user_input.lower() in ["need", "want", "anything"]:
-                        return False, "Please provide a clear loan purpose like 'home renovation', 'medical', etc."
-                    if any(term in user_input.lower() for term in ["illegal", "drugs", "weapons", "terrorism"]):
-                        return False, "Please provide a legal and acceptable loan purpose."
-                    return True, user_input
-               
-                success, value, message = self._validate_input_with_retry(
-                    f"{YELLOW}🤔 {question} (You can leave this process anytime if you wish){RESET}",
-                    validate_purpose,
-                    f"{RED}⚠️ Invalid loan purpose.{RESET}"
-                )
-               
-                if not success:
-                    if value == "USER_EXIT":
-                        print(f"{RED}You have chosen to exit. Exiting the process.{RESET}")
-                        return "USER_EXIT"
-                    elif self.is_ui_mode:
-                        return f"ERROR: {message}"
-                else:
-                    return value
- 
-            elif is_required_loan_amount:
-                def validate_amount(user_input):
-                    if not user_input:
-                        return False, "Loan amount is required."
-                    if not re.search(r'\d+', user_input):
-                        return False, "Please enter a number."
+                    return False, f"Invalid city. Please select from: {city_list_str}"
+ 
+            def validate_purpose(user_input):
+                purpose_lower = (user_input or "").lower()
+                if not user_input or purpose_lower in ["need", "want", "anything"]:
+                    return False, "Please provide a clear loan purpose like 'home renovation', 'medical', etc."
+                if any(term in purpose_lower for term in ["illegal", "drugs", "weapons", "terrorism"]):
+                    return False, "Please provide a legal and acceptable loan purpose."
+                return True, user_input
+ 
+            def validate_amount(user_input):
+                if not user_input:
+                    return False, "Loan amount is required."
+                if not re.search(r'\d+', user_input):
+                    return False, "Please enter a number."
+                return True, user_input
+ 
+            def validate_pdf_path(user_input):
+                if user_input and user_input.lower().endswith((".pdf", ".txt")):
+                    # In UI mode, be more lenient with file paths - let the PDF extractor handle it
+                    if self.is_ui_mode:
+                        return True, user_input
+                    # In CLI mode, check if file exists
+                    if not os.path.exists(user_input):
+                        print(f"{YELLOW}⚠️ Warning: File does not exist.{RESET}")
                     return True, user_input
-               
-                success, value, message = self._validate_input_with_retry(
-                    f"{YELLOW}🤔 {question} (Please enter a numeric value, or type 'stop' to exit){RESET}",
-                    validate_amount,
-                    f"{RED}⚠️ Invalid loan amount.{RESET}"
-                )
-               
-                if not success:
-                    if value == "USER_EXIT":
-                        print(f"{RED}You have chosen to exit. Exiting the process.{RESET}")
-                        return "USER_EXIT"
-                    elif self.is_ui_mode:
-                        return f"ERROR: {message}"
                 else:
-                    return value
- 
-            elif is_pdf_path_query:
-                def validate_pdf_path(user_input):
-                    if user_input and (user_input.lower().endswith(".pdf") or user_input.lower().endswith(".txt")):
-                        # In UI mode, be more lenient with file paths - let the PDF extractor handle it
-                        if self.is_ui_mode:
-                            return True, user_input
-                        # In CLI mode, check if file exists
-                        if not os.path.exists(user_input):
-                            print(f"{YELLOW}⚠️ Warning: File does not exist.{RESET}")
-                        return True, user_input
-                    else:
-                        return False, "Please provide a valid .pdf or .txt file path."
-               
-                success, value, message = self._validate_input_with_retry(
-                    f"{YELLOW}🤔 {question}{RESET}",
-                    validate_pdf_path,
-                    f"{RED}⚠️ Please provide a valid PDF or text file path.{RESET}"
-                )
-               
-                if not success:
+                    return False, "Please provide a valid .pdf or .txt file path."
+ 
+            # Validated prompts in priority order: (applies, prompt, validator, retry message)
+            validated_prompts = (
+                (is_required_city, f"{YELLOW}🤔 {question} (Available options: {city_list_str}){RESET}",
+                 validate_city, f"{RED}⚠️ Invalid city selection.{RESET}"),
+                (is_required_loan_purpose, f"{YELLOW}🤔 {question} (You can leave this process anytime if you wish){RESET}",
+                 validate_purpose, f"{RED}⚠️ Invalid loan purpose.{RESET}"),
+                (is_required_loan_amount, f"{YELLOW}🤔 {question} (Please enter a numeric value, or type 'stop' to exit){RESET}",
+                 validate_amount, f"{RED}⚠️ Invalid loan amount.{RESET}"),
+                (is_pdf_path_query, f"{YELLOW}🤔 {question}{RESET}",
+                 validate_pdf_path, f"{RED}⚠️ Please provide a valid PDF or text file path.{RESET}"),
+            )
+            for applies, prompt, validator, retry_message in validated_prompts:
+                if applies:
+                    success, value, message = self._validate_input_with_retry(prompt, validator, retry_message)
+                    if success:
+                        return value
                     if value == "USER_EXIT":
                         print(f"{RED}You have chosen to exit. Exiting the process.{RESET}")
                         return "USER_EXIT"
-                    elif self.is_ui_mode:
+                    if self.is_ui_mode:
                         return f"ERROR: {message}"
-                else:
-                    return value
+                    break
  
             # Fallback for any other question
             return self.get_user_input(f"{YELLOW}🤔 {question}{RESET}")
@@ -896,22 +1034,40 @@ REASON: [Brief explanation of your decision]
             print(f"[ERROR] UserInteractionAgent failed: {str(e)}")
             return f"An error occurred: {str(e)}"
  
-    def run(self, query: str) -> str:
+    def route_query(self, query: str) -> str:
+        """
+        Names the flow run() uses for a query: "terminated", "identity", a result key
+        from _QUERY_ROUTES, or "response" for general queries.
+        """
+        query = query.lower().strip()
+ 
+        # Check for termination keywords first
+        if any(keyword in query for keyword in self._termination_keywords):
+            return "terminated"
+        # PRIORITY 1: Identity flow
+        if any(keyword in query for keyword in _IDENTITY_QUERY_KEYWORDS):
+            return "identity"
+        for keyword_groups, _, result_key in _QUERY_ROUTES:
+            if all(any(keyword in query for keyword in group) for group in keyword_groups):
+                return result_key
+        return "response"
+
+    def run(self, query: str, route: Optional[str] = None) -> str:
         """
         Handles user interaction based on the query.
         This is the main entry point for the UserInteraction tool.
+        Pass route (from route_query) to skip re-routing a question that is being asked again.
         # Returns a JSON string indicating the type of information collected.
         """
         query = query.lower().strip()
         print(f"[DEBUG] UserInteractionAgent received query: '{query}'")
+        route = route or self.route_query(query)
  
-        # Check for termination keywords first
-        if any(keyword in query for keyword in self._termination_keywords):
+        if route == "terminated":
             return json.dumps({"status": "terminated", "message": "User has terminated the conversation."})
  
-        # Determine what information is being requested
-        # PRIORITY 1: Identity flow returns a JSON object with both "pan" and "aadhaar" keys
-        if "pan" in query or "aadhaar" in query:
+        # Identity flow returns a JSON object with both "pan" and "aadhaar" keys
+        if route == "identity":
             identity = self._get_identity_info(query)
             # Return both PAN and Aadhaar for security validation
             result = {"pan": identity}
@@ -920,28 +1076,13 @@ REASON: [Brief explanation of your decision]
             return json.dumps(result)
            
         # Other flows return a JSON string
-        elif "purpose" in query:
-            purpose = self._get_loan_purpose(query)
-            return json.dumps({"purpose": purpose})
-        elif "amount" in query:
-            amount = self._get_loan_amount(query)
-            return json.dumps({"amount": amount})
-        elif "city" in query:
-            city = self._get_city(query)
-            return json.dumps({"city": city})
-        elif "salary" in query and "update" in query:
-            response = self._confirm_salary_update(query)
-            return json.dumps({"salary_update_confirmation": response})
-        elif "path" in query or "document" in query or "pdf" in query:
-            path = self._get_pdf_path(query)
-            return json.dumps({"document_path": path})
-        elif "accept" in query or "decline" in query or "agreement" in query:
-            acceptance = self._get_agreement_acceptance(query)
-            return json.dumps({"agreement_response": acceptance})
-        else:
-            # Fallback for general queries
-            user_response = self.get_user_input(query)
-            return json.dumps({"response": user_response})
+        handler_name = _QUERY_HANDLERS.get(route)
+        if handler_name:
+            return json.dumps({route: getattr(self, handler_name)(query)})
+
+        # Fallback for general queries
+        user_response = self.get_user_input(query)
+        return json.dumps({"response": user_response})
  
     def set_initial_details(self, details: dict):
         """Sets initial loan details parsed from the first user request."""
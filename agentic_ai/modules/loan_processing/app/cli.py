@@ -24,22 +24,26 @@ def process_loan_application(user_request: str, automate_user: bool = False, cus
         print("❌ Request cannot be empty")
         return
     
-    # Initialize the LLM once at the beginning to prevent multiple initializations
-    llm = LLMFactory.get_llm()
-    if not clean_ui:
-        print("✓ LLM initialized successfully")
-    
-    orchestrator = LoanAgentOrchestrator(automate_user=automate_user, customer_profile=customer_profile, session_id=session_id, clean_ui=clean_ui)
-    
-    if clean_ui:
-        print("✓ System ready - Processing your loan application...")
-        print()
-    else:
-        print(f"\n{'='*60}")
-        print("🔄 MULTI-AGENT PROCESSING...")
-        print("=" * 60)
-    
-    result = orchestrator.process_application(user_request)
+    try:
+        # Initialize the LLM once at the beginning to prevent multiple initializations
+        llm = LLMFactory.get_llm()
+        if not clean_ui:
+            print("✓ LLM initialized successfully")
+
+        orchestrator = LoanAgentOrchestrator(automate_user=automate_user, customer_profile=customer_profile, session_id=session_id, clean_ui=clean_ui)
+
+        if clean_ui:
+            print("✓ System ready - Processing your loan application...")
+            print()
+        else:
+            print(f"\n{'='*60}")
+            print("🔄 MULTI-AGENT PROCESSING...")
+            print("=" * 60)
+
+        result = orchestrator.process_application(user_request)
+    except Exception as e:
+        print(LoanAgentOrchestrator._build_fallback_response(user_request, str(e), include_app_id=True))
+        return
     
     # Post-process output for Indian comma formatting - DISABLED to avoid double processing
     # The orchestrator already handles proper formatting
@@ -9,6 +9,7 @@ after multiple attempts.
 import re
 import json
 import time
+from collections import deque
 from typing import Dict, List, Any, Tuple
 from datetime import datetime
 from langchain.agents import Tool
@@ -17,6 +18,7 @@ from agentic_ai.modules.loan_processing.orchestrator.loan_agent_orchestrator imp
 from agentic_ai.modules.loan_processing.agents.user_interaction import UserInteractionAgent
 from agentic_ai.modules.loan_processing.agents.human_agent import get_human_agent
 from agentic_ai.core.utils.validators import is_pan, is_aadhaar
+from agentic_ai.core.config.constants import MAX_CONVERSATION_HISTORY
 
 
 class EscalationOrchestrator(LoanAgentOrchestrator):
@@ -37,12 +39,12 @@ class EscalationOrchestrator(LoanAgentOrchestrator):
         
         # Replace the interaction agent with regular one if not automated
         if not automate_user:
-            self.interaction_agent = UserInteractionAgent()
+            self.interaction_agent = UserInteractionAgent(data_agent=self.data_agent)
         
         # Escalation tracking
         self.max_attempts = max_attempts
         self.attempt_tracker = {}  # Tracks attempts per question/context
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=MAX_CONVERSATION_HISTORY)  # oldest turns drop off in O(1)
         self.human_agent = get_human_agent()
         
         # Override tools to add escalation support
@@ -316,7 +318,7 @@ class EscalationOrchestrator(LoanAgentOrchestrator):
             "user_input": tracker["responses"][-1]["response"] if tracker["responses"] else "",
             "question": question,
             "failure_count": tracker["attempts"],
-            "conversation_history": self.conversation_history.copy(),
+            "conversation_history": list(self.conversation_history),
             "context_key": context_key,
             "all_responses": [r["response"] for r in tracker["responses"]],
             "escalated_at": datetime.now().isoformat()
@@ -2,8 +2,15 @@
 import re
 import json
 import time
-from typing import Dict, Any
+import asyncio
+import logging
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Dict, Any, Iterator
 from langchain_core.tools import Tool
+from langgraph.graph import END
 from agentic_ai.modules.loan_processing.services.loan_data_service import LoanDataService
 from agentic_ai.modules.loan_processing.agents.data_query import DataQueryAgent
 from agentic_ai.modules.loan_processing.agents.geo_policy import GeoPolicyAgent
@@ -15,15 +22,178 @@ from agentic_ai.modules.loan_processing.agents.loan_purpose_assessment import Lo
 from agentic_ai.modules.loan_processing.agents.customer_agent import CustomerAgent
 from agentic_ai.modules.loan_processing.agents.agreement_agent import AgreementAgent
 from agentic_ai.core.orchestrator.agent_executor_factory import create_agent_workflow
+from agentic_ai.core.config.loader import set_structural_cache_scope
 from agentic_ai.core.utils.parsing import parse_initial_user_request, parse_amount_string
+from agentic_ai.core.utils.embeddings import get_sentence_transformer_model
 from agentic_ai.core.utils.formatting import format_indian_commas,format_indian_currency_without_decimal
-from agentic_ai.core.session.session_manager import get_session_manager
+from agentic_ai.core.session.session_manager import SessionManager, get_session_manager
+from agentic_ai.core.config.constants import MAX_CONVERSATION_HISTORY, STRICT_INPUT_VALIDATION, MIN_REQUEST_WORDS
+
+logger = logging.getLogger(__name__)
+# Debug detail for orchestrators built with clean_ui=False; its level is set once here, never per instance
+_verbose_logger = logging.getLogger(f"{__name__}.verbose")
+_verbose_logger.setLevel(logging.DEBUG)
+
+# Amount patterns shared by the prompt formatting and the fallback path
+# Amount with optional comma grouping and an optional lakh suffix (group 2)
+_AMOUNT_LAKH_RE = re.compile(r'₹?\s*(\d+(?:,\d+)*(?:\.\d+)?)\s*(lakhs?)?', re.IGNORECASE)
+_INTL_AMOUNT_RE = re.compile(r"(?<!₹)(\d{1,3}(?:,\d{3})+|\d{7,})")
+_RUPEE_INTL_AMOUNT_RE = re.compile(r"₹(\d{1,3}(?:,\d{3})+|\d{7,})")
+# PAN or Aadhaar in a human agent's reply, found in one left-to-right scan
+_HUMAN_ID_RE = re.compile(r'(?P<pan>[A-Z]{5}[0-9]{4}[A-Z])|(?P<aadhaar>\b\d{12}\b)')
+# Markers of a finished application in the final output, matched case-insensitively in one pass
+_COMPLETION_INDICATORS_RE = re.compile(
+    r"LOAN AGREEMENT|APPROVED|DECLINED|DIGITALLY ACCEPTED|USER_TERMINATED_APPLICATION", re.IGNORECASE
+)
+
+# Banner returned by _build_fallback_response when the agent workflow cannot run
+_FALLBACK_TEMPLATE = """
+🏦 **LOAN APPLICATION ERROR - FALLBACK MODE**
+{app_id_line}**Error Details:** {reason}
+**Requested Input:** {user_input}
+{amount_line}**Action Required:** Please check system configuration and resubmit.
+"""
+_FALLBACK_AMOUNT_LINE = "**Requested Amount:** {amount}\n"
+_FALLBACK_APP_ID_LINE = "**Reference ID:** APP-{app_id}\n"
+_PROMPT_FOR_AMOUNT_MSG = "❌ Please describe your loan request and include the amount, e.g. 'I need a 5 lakh home loan in Pune'."
+
+# Coordination prompt sections for process_application. The fixed text lives here so
+# it isn't rebuilt per request and the shared instructions stay byte-identical.
+_COORD_PROMPT_TMPL = """\
+LOAN APPLICATION REQUEST: "%s"
+
+🚨 ABSOLUTE MANDATORY RULE - NEVER SKIP THIS: 🚨
+After EVERY loan purpose collection, you MUST use LoanPurposeAssessment before asking for amount!
+Example: UserInteraction gets 'bike loan' → IMMEDIATELY use LoanPurposeAssessment with 'bike loan'
+
+CRITICAL INSTRUCTIONS - FOLLOW THIS SEQUENCE:
+IMPORTANT: After DataQuery step, you MUST check the response for salary-related actions before doing anything else!
+"""
+_COORD_PURPOSE_UNKNOWN = """\
+1. Ask for loan purpose using UserInteraction.
+2. ⚠️  CRITICAL MANDATORY STEP - NO EXCEPTIONS: ⚠️
+   IMMEDIATELY after receiving ANY loan purpose, you MUST use LoanPurposeAssessment tool!
+   Example: User says 'bike loan' → Use LoanPurposeAssessment with input: bike loan
+   - This maps the purpose to standardized categories (e.g., 'bike loan' → 'vehicle purchase')
+   - You MUST wait for LoanPurposeAssessment response before asking for amount!"""
+_COORD_PURPOSE_DETECTED = """\
+1. The loan purpose '%s' was detected from the initial request.
+2. ⚠️  CRITICAL MANDATORY STEP - NO EXCEPTIONS: ⚠️
+   IMMEDIATELY submit this purpose to LoanPurposeAssessment tool!
+   - This maps the purpose to standardized categories and checks policy eligibility.
+   - You MUST wait for LoanPurposeAssessment response before proceeding."""
+_COORD_PURPOSE_POLICY = """\
+   - If purpose is 'prohibited' (eligibility), stop processing and inform user.
+   - If purpose is 'conditionally_permitted', explain the conditions from policy_details.
+   - Only continue if purpose is 'permitted' or conditions are met."""
+_COORD_ASK_AMOUNT = """\
+3. ⚠️  ONLY AFTER LoanPurposeAssessment is COMPLETE: Ask for loan amount using UserInteraction
+   DO NOT ask for amount until you have received LoanPurposeAssessment response!"""
+_COORD_DATA_STEPS = """\
+4. Ask for PAN/Aadhaar using UserInteraction.
+5. Query user data with DataQuery.
+
+   **SECURITY VALIDATION** - If DataQuery returns error: "SECURITY_VALIDATION_FAILED":
+   → This means the PAN and Aadhaar don't belong to the same person
+   → Inform user: 'The PAN number you provided does not match your Aadhaar record. Please provide the correct PAN number.'
+   → Use UserInteraction to collect the correct PAN again
+
+   **IMPORTANT**: Ignore any '[INFO] No PAN provided' messages - these are normal during security validation.
+   **IMPORTANT**: Only treat explicit 'SECURITY_VALIDATION_FAILED' errors as security issues.
+   → Retry DataQuery with the corrected PAN
+
+6. **SALARY WORKFLOW - MANDATORY IMMEDIATE STEP**
+   CRITICAL: After DataQuery, check the response for special orchestrator messages!
+
+   **EXISTING USER** - If DataQuery response contains: "_orchestrator_next_action": "salary_update_question"
+   → This means an EXISTING USER was found and you MUST immediately ask:
+   → UserInteraction("Do you want to update your salary information?")
+   → Wait for user response (YES/NO)
+   → If user says YES: UserInteraction("Please upload your salary PDF file path")
+   → Then call PDFSalaryExtractor with the provided path
+   → If user says NO: Use UseExistingUserData tool to get the stored user data
+   → The UseExistingUserData tool returns the complete user data JSON
+   → For RiskAssessment, format as: UseExistingUserData_output|loan_amount
+
+   **NEW USER** - If DataQuery contains: "status": "new_user_found_proceed_to_salary_sheet"
+   → Your IMMEDIATE next action MUST be: UserInteraction("Please upload your salary information (PDF)")
+   → Then MANDATORY call PDFSalaryExtractor with the provided PDF path
+   → Store the extracted user_data from PDFSalaryExtractor for RiskAssessment
+
+   **CRITICAL**: Only after completing the salary workflow above, proceed to collect city.
+   - If DataQuery returns 'user_found_but_pan_needed', handle PAN requirement securely:
+     * Store the COMPLETE JSON response from DataQuery
+     * Use UserInteraction: 'To fetch your credit score for loan processing, please provide your PAN number.'
+     * SECURITY: Use ValidatePANAadhaar with format: complete_dataquery_json|provided_pan
+     * EXAMPLE: If DataQuery returned {...full json...} and user provided ABCDE1234F, use: '{...full json...}|ABCDE1234F'
+     * If validation fails, inform user: 'PAN number does not match our records for this Aadhaar. Please provide the correct PAN.'
+     * If validation passes, use CreditScoreByPAN tool with the validated PAN number
+     * Continue with the complete validated user data
+**CRITICAL SEQUENCE ENFORCEMENT:**
+
+STEP 5: DataQuery  
+  - If error: "SECURITY_VALIDATION_FAILED" → Ask for correct PAN and retry
+STEP 6: Check DataQuery response immediately for orchestrator messages:
+  - If "_orchestrator_next_action": "salary_update_question" → Ask existing user salary update question  
+  - If "status": "new_user_found_proceed_to_salary_sheet" → Ask for PDF upload
+STEP 7: Handle salary workflow (existing user update or new user PDF extraction)
+  - If existing user says NO: Use UseExistingUserData, then use output for RiskAssessment
+  - If existing user says YES: Use PDFSalaryExtractor
+  - If new user: Use PDFSalaryExtractor
+STEP 8: Ask for city ONLY after salary workflow is complete
+STEP 9: GeoPolicyCheck
+STEP 10: RiskAssessment with correct user data:
+  - Format: user_data_json|loan_amount
+  - For NO salary update: UseExistingUserData_output|loan_amount
+  - For YES/new user: PDFSalaryExtractor_user_data|loan_amount
+STEP 11: AgreementPresentation if approved
+
+DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrator adds special messages to force this."""
+_COORD_ASK_CITY = """\
+7. **ONLY AFTER SALARY WORKFLOW IS COMPLETE**: Ask for city using UserInteraction."""
+_COORD_FINAL_STEPS = """\
+8. Run GeoPolicyCheck with format: city:CITY,purpose:PURPOSE,amount:AMOUNT.
+9. **MANDATORY**: Run RiskAssessment with the correct user data:
+   - For EXISTING USERS who said NO to salary update: Use user_data from UseExistingUserData tool
+   - For NEW USERS: Use the user_data extracted by PDFSalaryExtractor (MANDATORY)
+   - For EXISTING USERS who updated salary: Use the user_data from PDFSalaryExtractor
+10. **AGREEMENT STEP**: If loan is APPROVED by RiskAssessment, use AgreementPresentation to show terms.
+11. **FINAL STEP**: After presenting agreement, ask user for acceptance using UserInteraction and process response.
+
+IMPORTANT: Execute ONE action at a time. Wait for each tool response before proceeding to the next step.
+Even if GeoPolicyCheck shows conditions, you MUST still run RiskAssessment to get the complete picture.
+If RiskAssessment shows APPROVED status, you MUST present the loan agreement using AgreementPresentation.
+
+EXECUTE ONE ACTION AT A TIME - DO NOT PLAN MULTIPLE STEPS IN ADVANCE."""
  
 class LoanAgentOrchestrator:
     """Orchestrates the loan processing workflow."""
 
-    def __init__(self, automate_user: bool = False, customer_profile=None, input_provider=None, session_id=None, clean_ui: bool = True):
+    __slots__ = (
+        'clean_ui', 'data_service', 'data_agent', 'geo_agent', 'risk_agent',
+        'interaction_agent', '_salary_generator', '_salary_retriever', '_pdf_extractor',
+        '_purpose_agent', '_agreement_agent', 'escalation_attempts', 'max_attempts',
+        'current_question_type', 'conversation_history', 'captured_agreement',
+        'captured_loan_details', 'captured_tool_outputs', 'stored_existing_user_data',
+        'session_manager', 'tools', 'agent_workflow', '_step_listener', '_log',
+    )
+
+    # Shared by all instances; loads are one-off and guarded by the loaders' own locks
+    _warmup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-warmup")
+
+    @classmethod
+    @cache
+    def _warm_up_models(cls) -> None:
+        """Starts the background model loads once per process; later orchestrators reuse what they loaded."""
+        cls._warmup_pool.submit(get_sentence_transformer_model)
+        cls._warmup_pool.submit(LoanPurposeAssessmentAgent)
+
+    def __init__(self, automate_user: bool = False, customer_profile=None, input_provider=None, session_id=None, clean_ui: bool = True, session_manager: SessionManager = None):
         self.clean_ui = clean_ui  # Control debug output visibility
+        self._log = logger if clean_ui else _verbose_logger
+        # Load the shared embedding model and the purpose policy in the background while the dataset,
+        # agents and session are set up; request parsing and the LoanPurposeAssessment tool need them shortly after
+        self._warm_up_models()
         self.data_service = LoanDataService()
         self.data_agent = DataQueryAgent(self.data_service)
         self.geo_agent = GeoPolicyAgent()
@@ -32,16 +202,18 @@ class LoanAgentOrchestrator:
         if automate_user:
             self.interaction_agent = CustomerAgent(profile=customer_profile)
         else:
-            self.interaction_agent = UserInteractionAgent(input_provider=input_provider)
-        self.salary_generator = SalarySheetGeneratorAgent()
-        self.salary_retriever = SalarySheetRetrieverAgent()
-        self.pdf_extractor = PDFSalaryExtractorAgent()
-        self.purpose_agent = LoanPurposeAssessmentAgent() # Add purpose assessment agent
-        self.agreement_agent = AgreementAgent() # Add agreement agent        # Escalation tracking
+            self.interaction_agent = UserInteractionAgent(input_provider=input_provider, data_agent=self.data_agent)
+        # Agents only some applications reach are created on first use (see the properties below)
+        self._salary_generator = None
+        self._salary_retriever = None
+        self._pdf_extractor = None
+        self._purpose_agent = None
+        self._agreement_agent = None
+        # Escalation tracking
         self.escalation_attempts = {}  # Track attempts per question type
         self.max_attempts = 3
         self.current_question_type = None
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=MAX_CONVERSATION_HISTORY)
         
         # Tool output capture for agreement extraction
         self.captured_agreement = None
@@ -52,7 +224,7 @@ class LoanAgentOrchestrator:
         self.stored_existing_user_data = None
         
         # Session management
-        self.session_manager = get_session_manager()
+        self.session_manager = session_manager or get_session_manager()
         # If a specific session_id is provided, resume that session
         if session_id:
             if not self.session_manager.resume_session(session_id):
@@ -67,7 +239,39 @@ class LoanAgentOrchestrator:
        
         self.tools = self._setup_tools()
         self.agent_workflow = create_agent_workflow(self.tools)
+        self._step_listener = None  # Set by stream_application to receive workflow states
  
+    @property
+    def purpose_agent(self):
+        """Loan purpose assessment agent; loads the sentence-transformer model on first use."""
+        if self._purpose_agent is None:
+            self._purpose_agent = LoanPurposeAssessmentAgent()
+        return self._purpose_agent
+
+    @property
+    def pdf_extractor(self):
+        if self._pdf_extractor is None:
+            self._pdf_extractor = PDFSalaryExtractorAgent()
+        return self._pdf_extractor
+
+    @property
+    def salary_generator(self):
+        if self._salary_generator is None:
+            self._salary_generator = SalarySheetGeneratorAgent()
+        return self._salary_generator
+
+    @property
+    def salary_retriever(self):
+        if self._salary_retriever is None:
+            self._salary_retriever = SalarySheetRetrieverAgent()
+        return self._salary_retriever
+
+    @property
+    def agreement_agent(self):
+        if self._agreement_agent is None:
+            self._agreement_agent = AgreementAgent()
+        return self._agreement_agent
+
     def _setup_tools(self):
         import json
         def risk_assessment_wrapper(query):
@@ -190,9 +394,13 @@ class LoanAgentOrchestrator:
                     'api_credit_score': api_credit_score
                 }
                
-                # Reconstruct input with fixed user_data
-                new_query = f"{json.dumps(user_data)}|{loan_amount_str}"
-                result = self.risk_agent.run(new_query)
+                try:
+                    loan_amount = float(loan_amount_str)
+                except ValueError:
+                    return json.dumps({"error": f"Invalid loan amount: {loan_amount_str}"})
+
+                # Hand the parsed user_data straight to the agent instead of re-serializing it
+                result = self.risk_agent.assess_risk_data(user_data, loan_amount, api_credit_score, raw_query=query)
                
                 # FINAL VERIFICATION: Parse the risk assessment result and verify credit score
                 try:
@@ -448,17 +656,17 @@ class LoanAgentOrchestrator:
             Tool(
                 name="PDFSalaryExtractor", 
                 description="MANDATORY for salary processing. Extracts salary information from PDF files. Use this tool: 1) For NEW USERS (when DataQuery returns 'new_user_found_proceed_to_salary_sheet') - REQUIRED to get salary data, 2) For EXISTING USERS who want to update salary. Input: absolute path to PDF file. The output contains 'user_data' that MUST be used for RiskAssessment. For NEW USERS, this is the ONLY way to get salary data - without this, RiskAssessment will fail with zero salary.",
-                func=self.pdf_extractor.run
+                func=lambda query: self.pdf_extractor.run(query)
             ),
             Tool(
                 name="SalarySheetGenerator",
                 description="FALLBACK ONLY. NEVER use this tool directly unless PDFSalaryExtractor explicitly returns 'fallback_needed': true or 'status': 'pdf_extraction_failed'. If PDFSalaryExtractor returns success, you MUST use that data instead of this tool. Generates mock salary sheet for a new user. Input format: 'user_identifier:PAN_OR_AADHAAR,salary_hint:50000,emi_hint:5000,credit_hint:650'",
-                func=self.salary_generator.run
+                func=lambda query: self.salary_generator.run(query)
             ),
             Tool(
                 name="SalarySheetRetriever",
                 description="Retrieves key financial data from a salary sheet JSON. Input: salary_sheet_json.",
-                func=self.salary_retriever.run
+                func=lambda query: self.salary_retriever.run(query)
             ),
             Tool(
                 name="AgreementPresentation",
@@ -468,7 +676,11 @@ class LoanAgentOrchestrator:
         ]
     def process_application(self, user_input: str) -> str:
         """Processes a loan application with session persistence."""
-        
+        # Optionally turn away junk requests (short, no amount) before any session or LLM work
+        if (STRICT_INPUT_VALIDATION and not self.session_manager.session_id
+                and len(user_input.split()) < MIN_REQUEST_WORDS and not _AMOUNT_LAKH_RE.search(user_input)):
+            return _PROMPT_FOR_AMOUNT_MSG
+
         # Check if we already have a session (from resume)
         if self.session_manager.session_id:
             print(f"📋 Continuing existing session: {self.session_manager.session_id}")
@@ -495,7 +707,7 @@ class LoanAgentOrchestrator:
                                 user_data = json.loads(entry.split("User: ", 1)[1])
                                 if "city" in user_data and user_data["city"]:
                                     self.session_manager.update_collected_data("city", user_data["city"])
-                                    print(f"[DEBUG] Restored city from conversation: {user_data['city']}")
+                                    self._log.debug("Restored city from conversation: %s", user_data['city'])
                             except:
                                 pass
                 
@@ -512,12 +724,10 @@ class LoanAgentOrchestrator:
                     parsed_amount = parse_amount_string(existing_data["amount"])
                     initial_loan_details["amount"] = parsed_amount if parsed_amount > 0 else existing_data["amount"]
                 
-                if not self.clean_ui:
-                    print(f"[DEBUG] Restored initial details: {initial_loan_details}")
+                self._log.debug("Restored initial details: %s", initial_loan_details)
             else:
-                # Parse initial request for new session
+                # Parse initial request for new session (persisted once below)
                 initial_loan_details = parse_initial_user_request(user_input)
-                self.session_manager.update_collected_data("initial_loan_details", initial_loan_details)
                 self.session_manager.add_conversation_entry("User", user_input)
                 self.session_manager.set_workflow_step(1, "Processing initial request")
         else:
@@ -526,11 +736,13 @@ class LoanAgentOrchestrator:
             existing_data = {}  # Initialize for new session
             existing_step = 0   # Initialize for new session
             
-            # Parse initial request and save to session
+            # Parse initial request (persisted once below)
             initial_loan_details = parse_initial_user_request(user_input)
-            self.session_manager.update_collected_data("initial_loan_details", initial_loan_details)
             self.session_manager.add_conversation_entry("User", user_input)
             self.session_manager.set_workflow_step(1, "Processing initial request")
+
+        # Cached ReAct steps are only replayed within this session
+        set_structural_cache_scope(session_id)
         
         # Store parsed details in session (only if not resuming or if details are new)
         existing_initial_details = existing_data.get("initial_loan_details", {})
@@ -546,9 +758,9 @@ class LoanAgentOrchestrator:
                 formatted_amount = format_indian_currency_without_decimal(numeric_amount)
                 # Replace all international formatted numbers in user_input with Indian format
                 # Use negative lookbehind to avoid double rupee symbols
-                user_input = re.sub(r"(?<!₹)(\d{1,3}(?:,\d{3})+|\d{7,})", formatted_amount, user_input)
+                user_input = _INTL_AMOUNT_RE.sub(formatted_amount, user_input)
                 # Also replace any existing rupee symbols with numbers to avoid ₹₹ patterns
-                user_input = re.sub(r"₹(\d{1,3}(?:,\d{3})+|\d{7,})", formatted_amount, user_input)
+                user_input = _RUPEE_INTL_AMOUNT_RE.sub(formatted_amount, user_input)
             else:
                 formatted_amount = None
         else:
@@ -562,117 +774,21 @@ class LoanAgentOrchestrator:
             self.interaction_agent.reset_state()
         self.interaction_agent.set_initial_details(initial_loan_details)
         # Dynamically build the prompt based on what we already know
-        prompt_parts = [f'LOAN APPLICATION REQUEST: "{user_input}"\n']
-        prompt_parts.append("🚨 ABSOLUTE MANDATORY RULE - NEVER SKIP THIS: 🚨")
-        prompt_parts.append("After EVERY loan purpose collection, you MUST use LoanPurposeAssessment before asking for amount!")
-        prompt_parts.append("Example: UserInteraction gets 'bike loan' → IMMEDIATELY use LoanPurposeAssessment with 'bike loan'")
-        prompt_parts.append("")
-        prompt_parts.append("CRITICAL INSTRUCTIONS - FOLLOW THIS SEQUENCE:")
-        prompt_parts.append("IMPORTANT: After DataQuery step, you MUST check the response for salary-related actions before doing anything else!")
-        prompt_parts.append("")
- 
-        # Always check purpose first, regardless of initial parsing
         purpose_from_parsing = initial_loan_details.get("purpose", "unknown")
+        prompt_parts = [_COORD_PROMPT_TMPL % user_input]
+        # Always check purpose first, regardless of initial parsing
         if purpose_from_parsing in ["unknown", "not_detected"]:
-            prompt_parts.append("1. Ask for loan purpose using UserInteraction.")
-            prompt_parts.append("2. ⚠️  CRITICAL MANDATORY STEP - NO EXCEPTIONS: ⚠️")
-            prompt_parts.append("   IMMEDIATELY after receiving ANY loan purpose, you MUST use LoanPurposeAssessment tool!")
-            prompt_parts.append("   Example: User says 'bike loan' → Use LoanPurposeAssessment with input: bike loan")
-            prompt_parts.append("   - This maps the purpose to standardized categories (e.g., 'bike loan' → 'vehicle purchase')")
-            prompt_parts.append("   - You MUST wait for LoanPurposeAssessment response before asking for amount!")
+            prompt_parts.append(_COORD_PURPOSE_UNKNOWN)
         else:
-            prompt_parts.append(f"1. The loan purpose '{purpose_from_parsing}' was detected from the initial request.")
-            prompt_parts.append("2. ⚠️  CRITICAL MANDATORY STEP - NO EXCEPTIONS: ⚠️")
-            prompt_parts.append("   IMMEDIATELY submit this purpose to LoanPurposeAssessment tool!")
-            prompt_parts.append("   - This maps the purpose to standardized categories and checks policy eligibility.")
-            prompt_parts.append("   - You MUST wait for LoanPurposeAssessment response before proceeding.")
-       
-        prompt_parts.append("   - If purpose is 'prohibited' (eligibility), stop processing and inform user.")
-        prompt_parts.append("   - If purpose is 'conditionally_permitted', explain the conditions from policy_details.")
-        prompt_parts.append("   - Only continue if purpose is 'permitted' or conditions are met.")
-       
+            prompt_parts.append(_COORD_PURPOSE_DETECTED % purpose_from_parsing)
+        prompt_parts.append(_COORD_PURPOSE_POLICY)
         if initial_loan_details.get("amount", 0) == 0:
-            prompt_parts.append("3. ⚠️  ONLY AFTER LoanPurposeAssessment is COMPLETE: Ask for loan amount using UserInteraction")
-            prompt_parts.append("   DO NOT ask for amount until you have received LoanPurposeAssessment response!")
-       
-        prompt_parts.append("4. Ask for PAN/Aadhaar using UserInteraction.")
-       
+            prompt_parts.append(_COORD_ASK_AMOUNT)
         # CRITICAL: Explicit salary handling workflow
-        prompt_parts.append("5. Query user data with DataQuery.")
-        prompt_parts.append("")
-        prompt_parts.append("   **SECURITY VALIDATION** - If DataQuery returns error: \"SECURITY_VALIDATION_FAILED\":")
-        prompt_parts.append("   → This means the PAN and Aadhaar don't belong to the same person")
-        prompt_parts.append("   → Inform user: 'The PAN number you provided does not match your Aadhaar record. Please provide the correct PAN number.'")
-        prompt_parts.append("   → Use UserInteraction to collect the correct PAN again")
-        prompt_parts.append("")
-        prompt_parts.append("   **IMPORTANT**: Ignore any '[INFO] No PAN provided' messages - these are normal during security validation.")
-        prompt_parts.append("   **IMPORTANT**: Only treat explicit 'SECURITY_VALIDATION_FAILED' errors as security issues.")
-        prompt_parts.append("   → Retry DataQuery with the corrected PAN")
-        prompt_parts.append("")
-        prompt_parts.append("6. **SALARY WORKFLOW - MANDATORY IMMEDIATE STEP**")
-        prompt_parts.append("   CRITICAL: After DataQuery, check the response for special orchestrator messages!")
-        prompt_parts.append("")
-        prompt_parts.append("   **EXISTING USER** - If DataQuery response contains: \"_orchestrator_next_action\": \"salary_update_question\"")
-        prompt_parts.append("   → This means an EXISTING USER was found and you MUST immediately ask:")
-        prompt_parts.append("   → UserInteraction(\"Do you want to update your salary information?\")")
-        prompt_parts.append("   → Wait for user response (YES/NO)")
-        prompt_parts.append("   → If user says YES: UserInteraction(\"Please upload your salary PDF file path\")")
-        prompt_parts.append("   → Then call PDFSalaryExtractor with the provided path")
-        prompt_parts.append("   → If user says NO: Use UseExistingUserData tool to get the stored user data")
-        prompt_parts.append("   → The UseExistingUserData tool returns the complete user data JSON")
-        prompt_parts.append("   → For RiskAssessment, format as: UseExistingUserData_output|loan_amount")
-        prompt_parts.append("")
-        prompt_parts.append("   **NEW USER** - If DataQuery contains: \"status\": \"new_user_found_proceed_to_salary_sheet\"")
-        prompt_parts.append("   → Your IMMEDIATE next action MUST be: UserInteraction(\"Please upload your salary information (PDF)\")")
-        prompt_parts.append("   → Then MANDATORY call PDFSalaryExtractor with the provided PDF path")
-        prompt_parts.append("   → Store the extracted user_data from PDFSalaryExtractor for RiskAssessment")
-        prompt_parts.append("")
-        prompt_parts.append("   **CRITICAL**: Only after completing the salary workflow above, proceed to collect city.")
-        prompt_parts.append("   - If DataQuery returns 'user_found_but_pan_needed', handle PAN requirement securely:")
-        prompt_parts.append("     * Store the COMPLETE JSON response from DataQuery")
-        prompt_parts.append("     * Use UserInteraction: 'To fetch your credit score for loan processing, please provide your PAN number.'")
-        prompt_parts.append("     * SECURITY: Use ValidatePANAadhaar with format: complete_dataquery_json|provided_pan")
-        prompt_parts.append("     * EXAMPLE: If DataQuery returned {...full json...} and user provided ABCDE1234F, use: '{...full json...}|ABCDE1234F'")
-        prompt_parts.append("     * If validation fails, inform user: 'PAN number does not match our records for this Aadhaar. Please provide the correct PAN.'")
-        prompt_parts.append("     * If validation passes, use CreditScoreByPAN tool with the validated PAN number")
-        prompt_parts.append("     * Continue with the complete validated user data")
-       
-        prompt_parts.append("""**CRITICAL SEQUENCE ENFORCEMENT:**
-
-STEP 5: DataQuery  
-  - If error: "SECURITY_VALIDATION_FAILED" → Ask for correct PAN and retry
-STEP 6: Check DataQuery response immediately for orchestrator messages:
-  - If "_orchestrator_next_action": "salary_update_question" → Ask existing user salary update question  
-  - If "status": "new_user_found_proceed_to_salary_sheet" → Ask for PDF upload
-STEP 7: Handle salary workflow (existing user update or new user PDF extraction)
-  - If existing user says NO: Use UseExistingUserData, then use output for RiskAssessment
-  - If existing user says YES: Use PDFSalaryExtractor
-  - If new user: Use PDFSalaryExtractor
-STEP 8: Ask for city ONLY after salary workflow is complete
-STEP 9: GeoPolicyCheck
-STEP 10: RiskAssessment with correct user data:
-  - Format: user_data_json|loan_amount
-  - For NO salary update: UseExistingUserData_output|loan_amount
-  - For YES/new user: PDFSalaryExtractor_user_data|loan_amount
-STEP 11: AgreementPresentation if approved
-
-DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrator adds special messages to force this.""")
- 
+        prompt_parts.append(_COORD_DATA_STEPS)
         if initial_loan_details.get("city", "unknown") == "unknown":
-            prompt_parts.append("7. **ONLY AFTER SALARY WORKFLOW IS COMPLETE**: Ask for city using UserInteraction.")
- 
-        prompt_parts.append("8. Run GeoPolicyCheck with format: city:CITY,purpose:PURPOSE,amount:AMOUNT.")
-        prompt_parts.append("9. **MANDATORY**: Run RiskAssessment with the correct user data:")
-        prompt_parts.append("   - For EXISTING USERS who said NO to salary update: Use user_data from UseExistingUserData tool")
-        prompt_parts.append("   - For NEW USERS: Use the user_data extracted by PDFSalaryExtractor (MANDATORY)")
-        prompt_parts.append("   - For EXISTING USERS who updated salary: Use the user_data from PDFSalaryExtractor")
-        prompt_parts.append("10. **AGREEMENT STEP**: If loan is APPROVED by RiskAssessment, use AgreementPresentation to show terms.")
-        prompt_parts.append("11. **FINAL STEP**: After presenting agreement, ask user for acceptance using UserInteraction and process response.")
-        prompt_parts.append("\nIMPORTANT: Execute ONE action at a time. Wait for each tool response before proceeding to the next step.")
-        prompt_parts.append("Even if GeoPolicyCheck shows conditions, you MUST still run RiskAssessment to get the complete picture.")
-        prompt_parts.append("If RiskAssessment shows APPROVED status, you MUST present the loan agreement using AgreementPresentation.")
-        prompt_parts.append("\nEXECUTE ONE ACTION AT A TIME - DO NOT PLAN MULTIPLE STEPS IN ADVANCE.")
- 
+            prompt_parts.append(_COORD_ASK_CITY)
+        prompt_parts.append(_COORD_FINAL_STEPS)
         coordination_prompt = "\n".join(prompt_parts)
  
         try:
@@ -706,13 +822,12 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
                 pan = collected_data.get("pan", "")
                 aadhaar = collected_data.get("aadhaar", "")
                 
-                if not self.clean_ui:
-                    print(f"[DEBUG] Restored from session - Purpose: {purpose}, Amount: {amount}, City: {city}, PAN: {pan}, Aadhaar: {aadhaar}")
+                self._log.debug("Restored from session - Purpose: %s, Amount: %s, City: %s, PAN: %s, Aadhaar: %s",
+                                purpose, amount, city, pan, aadhaar)
                 
                 # CRITICAL: Restore UserInteractionAgent state for security validation
                 if pan and aadhaar:
-                    if not self.clean_ui:
-                        print(f"[DEBUG] Restoring UserInteractionAgent with both identifiers for security validation")
+                    self._log.debug("Restoring UserInteractionAgent with both identifiers for security validation")
                     # Restore the interaction agent state
                     self.interaction_agent._pan_number = pan
                     self.interaction_agent._pan_collected = True
@@ -724,8 +839,7 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
             # CRITICAL: If city was detected in initial parsing but not in session, use the parsed value
             if not city and initial_loan_details.get("city") and initial_loan_details.get("city") != "unknown":
                 city = initial_loan_details.get("city")
-                if not self.clean_ui:
-                    print(f"[DEBUG] Using city from initial parsing: {city}")
+                self._log.debug("Using city from initial parsing: %s", city)
                 # Save it to session immediately
                 self.session_manager.update_collected_data("city", city)
             
@@ -734,8 +848,7 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
                 parsed_amount = parse_amount_string(str(initial_loan_details.get("amount")))
                 if parsed_amount > 0:
                     amount = str(parsed_amount)
-                    if not self.clean_ui:
-                        print(f"[DEBUG] Using amount from initial parsing: {amount}")
+                    self._log.debug("Using amount from initial parsing: %s", amount)
                     # Save it to session immediately
                     self.session_manager.update_collected_data("amount", amount)
             
@@ -760,7 +873,15 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
                 # Add workflow termination flag
                 "workflow_finished": False,
             }
-            final_state = self.agent_workflow.invoke(initial_state, config={"recursion_limit": 100})  # Increased limit for complex scenarios
+            # Stream the graph so each step can be reported. The pinned langgraph yields one
+            # {node: update} chunk per step and then {END: full state}, which is invoke()'s result
+            final_state = initial_state
+            for chunk in self.agent_workflow.stream(initial_state, config={"recursion_limit": 100}):  # Increased limit for complex scenarios
+                for node, update in chunk.items():
+                    if node == END:
+                        final_state = update
+                    elif self._step_listener and isinstance(update, dict):
+                        self._step_listener(update)
             agent_outcome = final_state.get('agent_outcome')
             
             # Save intermediate state to session during workflow
@@ -830,8 +951,7 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
                 )
 
             # Determine if this is a successful completion or termination
-            completion_indicators = ["LOAN AGREEMENT", "APPROVED", "DECLINED", "DIGITALLY ACCEPTED", "USER_TERMINATED_APPLICATION"]
-            is_completed = any(indicator in output.upper() for indicator in completion_indicators)
+            is_completed = _COMPLETION_INDICATORS_RE.search(output) is not None
             
             if is_completed:
                 self.session_manager.complete_session(output)
@@ -899,21 +1019,107 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
             else:
                 return output
         except Exception as e:
-            print(f"[ERROR] Master agent invocation failed: {str(e)}")
+            logger.error("Master agent invocation failed: %s", e)
             return self._fallback_processing(user_input, str(e))
  
+    async def aprocess_application(self, user_input: str):
+        """Async variant of process_application; the workflow runs in a worker thread."""
+        return await asyncio.to_thread(self.process_application, user_input)
+
+    def stream_application(self, user_input: str) -> Iterator[Any]:
+        """Processes an application, yielding a progress line as each tool is chosen and then the result.
+
+        The last item is exactly what process_application returns. The workflow runs in a
+        worker thread, so closing the generator early does not cancel it.
+        """
+        done = object()
+        states = queue.Queue()
+
+        def run():
+            try:
+                return self.process_application(user_input)
+            finally:
+                states.put(done)
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="loan-stream")
+        self._step_listener = states.put
+        try:
+            future = executor.submit(run)
+            last_outcome = None
+            while (state := states.get()) is not done:
+                outcome = state.get("agent_outcome")
+                if outcome is not last_outcome and hasattr(outcome, "tool"):
+                    yield f"🔄 Running {outcome.tool}..."
+                last_outcome = outcome
+            yield future.result()
+        finally:
+            self._step_listener = None
+            # Do not wait here: an early close returns at once while the workflow finishes in the background
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def process_many(cls, user_inputs: list, max_workers: int = 8, **orchestrator_kwargs) -> list:
+        """Processes independent applications concurrently and returns results in input order.
+
+        Each application gets its own orchestrator and session, so this is meant for
+        non-interactive runs (automate_user=True or a UI input_provider).
+        """
+        def process_one(user_input):
+            orchestrator = cls(session_manager=SessionManager(), **orchestrator_kwargs)
+            return orchestrator.process_application(user_input)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(process_one, user_inputs))
+
+    @classmethod
+    def process_batch(cls, user_inputs: list, max_workers: int = 8, **orchestrator_kwargs) -> list:
+        """Like process_many, but screens every stated loan purpose with one batched compliance call first.
+
+        Requests whose purpose is rejected are answered without starting a workflow.
+        """
+        purposes = [parse_initial_user_request(user_input).get("purpose") for user_input in user_inputs]
+        screened = [i for i, purpose in enumerate(purposes) if purpose and purpose not in ("unknown", "not_detected")]
+        results = [None] * len(user_inputs)
+        if screened:
+            verdicts = UserInteractionAgent().evaluate_purposes_batch([purposes[i] for i in screened])
+            for i, (is_valid, message) in zip(screened, verdicts):
+                if not is_valid:
+                    results[i] = message
+        remaining = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(remaining, cls.process_many([user_inputs[i] for i in remaining],
+                                                         max_workers=max_workers, **orchestrator_kwargs)):
+            results[i] = result
+        return results
+
     def _fallback_processing(self, user_input: str, reason: str) -> str:
         """Fallback processing when the main agent fails."""
+        return self._build_fallback_response(user_input, reason)
+
+    @classmethod
+    def _build_fallback_response(cls, user_input: str, reason: str, include_app_id: bool = False) -> str:
+        """Builds the fallback banner; shared by the orchestrator and the CLI error path."""
         # Suppress fallback message for specific early_stopping_method error
         if "Got unsupported early_stopping_method `generate`" in reason:
-            return ""  
-        loan_amount = parse_initial_user_request(user_input).get('amount', 0)
-        return f"""
-🏦 **LOAN APPLICATION ERROR - FALLBACK MODE**
-**Error Details:** {reason}
-**Requested Input:** {user_input}
-**Action Required:** Please check system configuration and resubmit.
-"""
+            return ""
+        loan_amount = cls._extract_fallback_amount(user_input)
+        return _FALLBACK_TEMPLATE.format_map({
+            "reason": reason,
+            "user_input": user_input,
+            "amount_line": _FALLBACK_AMOUNT_LINE.format(amount=format_indian_commas(loan_amount)) if loan_amount else "",
+            "app_id_line": _FALLBACK_APP_ID_LINE.format(app_id=time.strftime("%Y%m%d%H%M%S", time.gmtime())) if include_app_id else "",
+        })
+
+    @staticmethod
+    def _extract_fallback_amount(user_input: str) -> float:
+        """Cheap regex amount extraction for the fallback path (no embedding model)."""
+        amount_match = _AMOUNT_LAKH_RE.search(user_input)
+        if not amount_match:
+            return 0
+        multiplier = 100000 if amount_match.group(2) else 1
+        try:
+            return float(amount_match.group(1).replace(',', '')) * multiplier
+        except ValueError:
+            return 0
 
     def _get_existing_user_data_for_risk_assessment(self) -> str:
         """Retrieves stored existing user data for RiskAssessment when user chooses not to update salary."""
@@ -1287,12 +1493,16 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
             key = hash(question)
         if key not in self.escalation_attempts:
             self.escalation_attempts[key] = 0
+        # Route the question once: retries ask for the same information, and the error
+        # message prefixed to a retried question must not send it down another flow
+        route_query = getattr(self.interaction_agent, "route_query", None)
+        route = route_query(question) if route_query else None
         while self.escalation_attempts[key] < self.max_attempts:
             self.escalation_attempts[key] += 1
             attempt_num = self.escalation_attempts[key]
             print(f"🔄 Attempt {attempt_num}/{self.max_attempts} - UserInteractionAgent")
             
-            response = self.interaction_agent.run(question)
+            response = self.interaction_agent.run(question, route=route) if route else self.interaction_agent.run(question)
             
             # Add to local conversation history
             self.conversation_history.append(f"System: {question}")
@@ -1369,27 +1579,27 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
         Extract actionable information from human response if available.
         For example, if human says "use PAN: ABCDE1234F", extract the PAN.
         """
-        import re
-        
-        # Look for PAN pattern in human response
-        pan_match = re.search(r'[A-Z]{5}[0-9]{4}[A-Z]{1}', human_response)
-        if pan_match and "pan" in original_question.lower():
-            return pan_match.group()
+        question_lower = original_question.lower()
         
-        # Look for Aadhaar pattern in human response
-        aadhaar_match = re.search(r'\b\d{12}\b', human_response)
-        if aadhaar_match and "aadhaar" in original_question.lower():
-            return aadhaar_match.group()
+        # Look for PAN and Aadhaar patterns in human response
+        found = {}
+        for match in _HUMAN_ID_RE.finditer(human_response):
+            found.setdefault(match.lastgroup, match.group())
+        if "pan" in found and "pan" in question_lower:
+            return found["pan"]
+        if "aadhaar" in found and "aadhaar" in question_lower:
+            return found["aadhaar"]
             
-        # Look for consent responses
-        consent_words = ["yes", "agree", "consent", "allow", "permit", "authorize", "proceed"]
-        if any(word in human_response.lower() for word in consent_words) and ("consent" in original_question.lower() or "aadhaar" in original_question.lower()):
-            return "yes"
-        
-        # Look for denial responses  
-        denial_words = ["no", "deny", "decline", "refuse", "reject"]
-        if any(word in human_response.lower() for word in denial_words) and ("consent" in original_question.lower() or "aadhaar" in original_question.lower()):
-            return "no"
+        if "consent" in question_lower or "aadhaar" in question_lower:
+            response_lower = human_response.lower()
+            # Look for consent responses
+            consent_words = ["yes", "agree", "consent", "allow", "permit", "authorize", "proceed"]
+            if any(word in response_lower for word in consent_words):
+                return "yes"
+            # Look for denial responses  
+            denial_words = ["no", "deny", "decline", "refuse", "reject"]
+            if any(word in response_lower for word in denial_words):
+                return "no"
             
         # If no specific info found, return None
         return None
@@ -1449,7 +1659,7 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
                 "user_input": user_response,
                 "question": question,
                 "failure_count": 3,
-                "conversation_history": self.conversation_history.copy(),
+                "conversation_history": list(self.conversation_history),
                 "error_message": error_message,
                 "escalated_from": "orchestrator"
             }
@@ -1516,7 +1726,7 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
         """Save current orchestrator state to session"""
         orchestrator_state = {
             "escalation_attempts": self.escalation_attempts,
-            "conversation_history": self.conversation_history,
+            "conversation_history": list(self.conversation_history),
             "captured_agreement": self.captured_agreement,
             "captured_loan_details": self.captured_loan_details,
             "captured_tool_outputs": self.captured_tool_outputs,
@@ -1528,7 +1738,7 @@ DO NOT SKIP THE SALARY WORKFLOW IN STEP 6-7. For existing users, the orchestrato
     def _restore_state_from_session(self, orchestrator_state):
         """Restore orchestrator state from session"""
         self.escalation_attempts = orchestrator_state.get("escalation_attempts", {})
-        self.conversation_history = orchestrator_state.get("conversation_history", [])
+        self.conversation_history = deque(orchestrator_state.get("conversation_history", []), maxlen=MAX_CONVERSATION_HISTORY)
         self.captured_agreement = orchestrator_state.get("captured_agreement", None)
         self.captured_loan_details = orchestrator_state.get("captured_loan_details", None)
         self.captured_tool_outputs = orchestrator_state.get("captured_tool_outputs", {})
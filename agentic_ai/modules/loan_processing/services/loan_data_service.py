@@ -1,24 +1,69 @@
 # loan_data_service.py
 import os
-import pandas as pd
 import numpy as np
-from typing import Dict
-from agentic_ai.core.config.constants import DATASET_PATH
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from agentic_ai.core.config.constants import DATASET_PATH, AVAILABLE_CITIES
 from agentic_ai.core.utils.validators import is_pan, is_aadhaar
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Identifier columns are read as strings so Aadhaar numbers are never parsed as integers
+IDENTIFIER_DTYPES = {
+    col: str for col in ('PAN', 'Aadhaar', 'pan', 'pan_no', 'aadhaar', 'aadhaar_no', 'aadhar', 'pan_number', 'aadhaar_number')
+}
+
+# Cities assigned to datasets that have no 'city' column
+CITY_ARRAY = np.array(AVAILABLE_CITIES)
+
 class LoanDataService:
     """Manages loan dataset operations."""
 
+    # Processed datasets and their lookup indexes keyed by path; the dataset is static for a session
+    _dataset_cache: Dict[str, Dict[str, Any]] = {}
+
     def __init__(self, dataset_path: str = DATASET_PATH):
-        if not os.path.exists(dataset_path):
-            print(f"⚠️ Dataset {dataset_path} not found. Creating sample dataset.")
-        self.df = self._load_or_create_dataset(dataset_path)
+        cached = LoanDataService._dataset_cache.get(dataset_path)
+        if cached is None:
+            if not os.path.exists(dataset_path):
+                print(f"⚠️ Dataset {dataset_path} not found. Creating sample dataset.")
+            df = self._load_or_create_dataset(dataset_path)
+            cached = {"df": df, "records": self._build_records(df), "cols": self._build_columns(df), **self._build_indexes(df)}
+            LoanDataService._dataset_cache[dataset_path] = cached
+        self.df = cached["df"]
+        self._pan_index = cached["pan_index"]
+        self._aadhaar_index = cached["aadhaar_index"]
+        self._records = cached["records"]
+        self.cols = cached["cols"]
+
+    @staticmethod
+    def _build_records(df: "pd.DataFrame") -> list:
+        """Convert every row to a dict of native Python values once, at load time."""
+        return df.astype(object).where(df.notna(), None).to_dict('records')
+
+    @staticmethod
+    def _build_columns(df: "pd.DataFrame") -> Dict[str, np.ndarray]:
+        """Column-wise NumPy view of the dataset for vectorized batch scoring."""
+        return {name: df[name].to_numpy() for name in df.columns}
 
-    def _load_or_create_dataset(self, path: str) -> pd.DataFrame:
+    @staticmethod
+    def _build_indexes(df: "pd.DataFrame") -> Dict[str, Dict[str, int]]:
+        """Map each PAN and Aadhaar to the position of its first row."""
+        indexes = {}
+        for name, column in (("pan_index", "pan_number"), ("aadhaar_index", "aadhaar_number")):
+            index = {}
+            for position, value in enumerate(df[column]):
+                index.setdefault(value, position)
+            indexes[name] = index
+        return indexes
+
+    def _load_or_create_dataset(self, path: str) -> "pd.DataFrame":
         """Load existing dataset or create sample data."""
+        # pandas is only needed to build the dataset, so importing this module stays cheap
+        import pandas as pd
         if os.path.exists(path):
             try:
-                df = pd.read_csv(path)
+                df = pd.read_csv(path, dtype=IDENTIFIER_DTYPES)
                 print(f"✓ Loading loan dataset with {df.shape[0]} records")
             except Exception as e:
                 print(f"⚠️ Error loading dataset: {e}. Creating sample data.")
@@ -29,7 +74,7 @@ class LoanDataService:
         
         return self._process_dataset(df)
 
-    def _create_sample_dataset(self) -> pd.DataFrame:
+    def _create_sample_dataset(self) -> "pd.DataFrame":
         """Create sample dataset for testing."""
         np.random.seed(42)
         data = {
@@ -44,9 +89,10 @@ class LoanDataService:
             'avg_daily_transactions': [5, 8, 12, 3, 15],
             'city': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata']
         }
+        import pandas as pd
         return pd.DataFrame(data)
 
-    def _process_dataset(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _process_dataset(self, df: "pd.DataFrame") -> "pd.DataFrame":
         """Process and enhance dataset."""
         # Ensure consistent column naming regardless of input format
         column_mapping = {
@@ -68,54 +114,67 @@ class LoanDataService:
         if 'aadhaar_number' not in df.columns:
             df['aadhaar_number'] = None
             
-        # Fill NaN values in numeric columns
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        df[numeric_cols] = df[numeric_cols].fillna(0)
+        # Fill NaN values in numeric columns (only those that actually contain NaN)
+        numeric_cols = [col for col in df.select_dtypes(include=[np.number]).columns if df[col].hasnans]
+        if numeric_cols:
+            df[numeric_cols] = df[numeric_cols].fillna(0)
         
         # Add city column if not present
         if 'city' not in df.columns:
-            df['city'] = np.random.choice(
-                ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Surat', 'Jaipur'],
-                size=len(df)
-            )
+            df['city'] = np.random.default_rng(42).choice(CITY_ARRAY, size=len(df))
             
         # Ensure all strings are properly stripped
         for col in ['pan_number', 'aadhaar_number']:
             if col in df.columns:
-                df[col] = df[col].astype(str).apply(lambda x: x.strip() if not pd.isna(x) else x)
+                df[col] = df[col].astype(str).str.strip()
                 
         return df
 
+    def batch_risk(self, loan_amounts, tenure_months: int = 36) -> np.ndarray:
+        """Grade every user in one vectorized pass by projected debt-to-income ratio.
+
+        loan_amounts is a scalar or an array aligned with the dataset rows.
+        Uses the same 30%/50% DTI thresholds as the risk assessment agent.
+        """
+        salary = self.cols['monthly_salary'].astype(float)
+        existing_emi = self.cols['existing_emi'].astype(float)
+        proposed_emi = np.asarray(loan_amounts, dtype=float) / tenure_months
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dti_ratio = np.where(salary > 0, (existing_emi + proposed_emi) / salary * 100, np.inf)
+        return np.select([dti_ratio <= 30, dti_ratio <= 50], ['Low', 'Medium'], default='High')
+
     def get_user_data(self, identifier: str) -> Dict:
         """Query user data by PAN or Aadhaar, EXCLUDING credit score."""
         try:
             cleaned_identifier = identifier.strip()
-            pan_mask = self.df['pan_number'] == cleaned_identifier
-            aadhaar_mask = self.df['aadhaar_number'] == cleaned_identifier
-            mask = pan_mask | aadhaar_mask
-            result = self.df[mask]
-            if not result.empty:
-                matched_row = result.iloc[0]
-                match_by = "PAN" if matched_row['pan_number'] == cleaned_identifier else "Aadhaar"
-                print(f"✓ Found existing user via {match_by}: {cleaned_identifier}")
-            else:
+            pan_position = self._pan_index.get(cleaned_identifier)
+            aadhaar_position = self._aadhaar_index.get(cleaned_identifier)
+            positions = [p for p in (pan_position, aadhaar_position) if p is not None]
+            if not positions:
                 print(f"⚠️ User not found in dataset: {cleaned_identifier}")
-            if result.empty:
                 user_data = {
                     "pan_number": cleaned_identifier if is_pan(cleaned_identifier) else None,
                     "aadhaar_number": cleaned_identifier if is_aadhaar(cleaned_identifier) else None,
                     "status": "new_user_found_proceed_to_salary_sheet"
                 }
                 return user_data
-            user_data = result.iloc[0].to_dict()
+            user_data = dict(self._records[min(positions)])
+            match_by = "PAN" if user_data['pan_number'] == cleaned_identifier else "Aadhaar"
+            print(f"✓ Found existing user via {match_by}: {cleaned_identifier}")
+            # Records already hold native Python values with None for missing data
             # Remove credit_score from user_data if present
             user_data.pop('credit_score', None)
-            for key, value in user_data.items():
-                if pd.isna(value):
-                    user_data[key] = None
-                elif hasattr(value, 'item'):
-                    user_data[key] = value.item()
             user_data["status"] = "existing_user_data_retrieved"
             return user_data
         except Exception as e:
             return {"error": f"Query failed: {str(e)}"}
+
+    def get_aadhaar_by_pan(self, pan: str) -> Optional[str]:
+        """Return the Aadhaar linked to a PAN, or None if the PAN is unknown."""
+        position = self._pan_index.get(pan.strip())
+        return self.cols['aadhaar_number'][position] if position is not None else None
+
+    def get_pan_by_aadhaar(self, aadhaar: str) -> Optional[str]:
+        """Return the PAN linked to an Aadhaar, or None if the Aadhaar is unknown."""
+        position = self._aadhaar_index.get(aadhaar.strip())
+        return self.cols['pan_number'][position] if position is not None else None
@@ -0,0 +1,20 @@
+import numpy as np
+from agentic_ai.core.config.constants import EMBEDDING_MODEL_NAME
+from agentic_ai.modules.loan_processing.agents.loan_purpose_assessment import LoanPurposeAssessmentAgent
+
+def build_purpose_embeddings():
+    """
+    Encodes the loan purpose categories once and saves them next to the policy file,
+    so the assessment agent starts without running the sentence model.
+    The agent only reads this file; rerun the script after changing the policy or the model.
+    """
+    agent = LoanPurposeAssessmentAgent()
+    path = agent._frozen_embeddings_path()
+    np.savez(path,
+             emb=np.asarray(agent._precompute_embeddings(), dtype=np.float32),
+             labels=np.array(agent.purpose_categories),
+             model=np.array(EMBEDDING_MODEL_NAME))
+    print(f"Saved {len(agent.purpose_categories)} purpose embeddings to {path}")
+
+if __name__ == "__main__":
+    build_purpose_embeddings()
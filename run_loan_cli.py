@@ -1,9 +1,9 @@
 import click
 import logging
-from agentic_ai.modules.loan_processing.app.cli import process_loan_application
 from agentic_ai.core.session.session_manager import SessionManager
 import random
 import os
+import sys
 
 # Configure logging for clean CLI output
 def setup_clean_logging(verbose=False):
@@ -97,6 +97,9 @@ def main(session_id, customer_agent, status, list_sessions, verbose):
             print(f"❓ Session {status} has unknown status: {session_status}")
         return
 
+    # Deferred so --list/--status don't load the dataset, LLM and agent stack
+    from agentic_ai.modules.loan_processing.app.cli import process_loan_application
+
     # Handle resume session via positional session_id
     if session_id:
         session_manager = SessionManager()
@@ -149,8 +152,18 @@ def main(session_id, customer_agent, status, list_sessions, verbose):
     else:
         # Manual mode: Continue until user chooses to exit
         try:
+            interactive = sys.stdin.isatty()
             while True:
-                request = click.prompt('Enter your loan request')
+                if interactive:
+                    request = click.prompt('Enter your loan request')
+                else:
+                    # Piped input: one request per line, stop at end of input
+                    line = sys.stdin.readline()
+                    if not line:
+                        break
+                    request = line.strip()
+                    if not request:
+                        continue
                 if request.strip().lower() in ['stop', 'exit', 'quit']:
                     print('Exiting loan processing. Goodbye!')
                     break